@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from testskool.live import live_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # HTTP goes to Django, WebSockets to the live quiz sessions
+    if scope["type"] == "websocket":
+        return await live_application(scope, receive, send)
+    return await django_application(scope, receive, send)
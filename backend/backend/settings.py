@@ -57,6 +57,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Query count, DB time, cache hits / misses and total time of every request
+    'testskool.instrumentation.ServerTimingMiddleware',
+    # cProfile one in PROFILING_SAMPLE_RATE requests, off unless set
+    'testskool.profiling.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +83,9 @@ CORS_ALLOW_CREDENTIALS: False
 CORS_ALLOW_ALL_ORIGINS = False
 
 # Caching settings
+# The subject catalog and quiz payloads are cached under versions kept in the
+# database, so a per-process cache still serves every change in every worker.
+# Cached users are not, see AUTH_USER_CACHE_TIMEOUT.
 # https://docs.djangoproject.com/en/5.1/topics/cache/#local-memory-caching
 CACHES = {
     'default': {
@@ -87,13 +94,17 @@ CACHES = {
     }
 }
 
+# SQLite file holding the throttling counters, shared by the worker processes on this host
+THROTTLE_STORE_PATH = os.getenv('THROTTLE_STORE_PATH', BASE_DIR / 'throttle.sqlite3')
+
 # https://www.django-rest-framework.org/#example
 REST_FRAMEWORK = {
     # Throttling setting
     # https://www.django-rest-framework.org/api-guide/throttling/#setting-the-throttling-policy
+    # Token buckets shared by all worker processes (see THROTTLE_STORE_PATH)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'testskool.throttling.SharedAnonRateThrottle',
+        'testskool.throttling.SharedUserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '180/minute',
@@ -106,11 +117,61 @@ REST_FRAMEWORK = {
     ],
 
     # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/getting_started.html#project-configuration
+    # JWTAuthentication with a cached user lookup
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'testskool.authentication.CachedJWTAuthentication',
     ),
+
+    # https://www.django-rest-framework.org/api-guide/renderers/#setting-the-renderers
+    # JSON on orjson when installed (testskool.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'testskool.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'testskool.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Seconds an authenticated user stays cached, entries are also dropped on any user change
+# Changes only reach the processes sharing CACHES, with LocMemCache and several
+# workers this is how long a deleted or deactivated user may still be accepted
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Bulk roster registration
+# Rows are validated and inserted in batches, passwords are hashed in a process pool
+# started once per web worker (testskool.roster.hash_pool)
+ROSTER_BATCH_SIZE = 1000
+ROSTER_HASH_WORKERS = os.cpu_count() or 1
+
+# Question bank import / export (testskool.question_bank), rows per INSERT batch and per export chunk
+QUESTION_BANK_BATCH_SIZE = 1000
+
+# Grade book CSV export (testskool.gradebook), solutions fetched per database round trip
+GRADEBOOK_CHUNK_SIZE = 2000
+
+# Quiz grading (testskool.grading), solutions read per batch and ids per UPDATE
+GRADING_BATCH_SIZE = 5000
+GRADING_UPDATE_CHUNK = 900
+
+# Live quiz sessions (testskool.live), answers are saved every LIVE_FLUSH_INTERVAL seconds or
+# LIVE_FLUSH_SIZE answers, tallies sent to the host at most every LIVE_TALLY_INTERVAL seconds
+LIVE_FLUSH_INTERVAL = 1.0
+LIVE_FLUSH_SIZE = 500
+LIVE_TALLY_INTERVAL = 0.25
+LIVE_QUEUE_SIZE = 100
+
+# Subject leaderboards (testskool.leaderboard), seconds between syncs with other processes' scores
+LEADERBOARD_SYNC_INTERVAL = 5
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+
+# Full-text search (testskool.search), results per search request
+SEARCH_RESULTS = 20
+SEARCH_MAX_RESULTS = 100
+
 # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=45),
@@ -152,6 +213,33 @@ DATABASES = {
     }
 }
 
+# SQLite production profile, enabled with SQLITE_PRODUCTION=True in the .env file
+# https://docs.djangoproject.com/en/5.1/ref/databases/#sqlite-notes
+# WAL lets readers run during a write, busy_timeout makes writers wait for the
+# lock instead of failing with "database is locked", and BEGIN IMMEDIATE takes
+# the write lock when a transaction starts rather than on its first write.
+SQLITE_PRODUCTION = os.getenv('SQLITE_PRODUCTION', 'False') == 'True'
+
+SQLITE_PRODUCTION_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA busy_timeout=20000;'
+        'PRAGMA cache_size=-20000;'  # 20 MB
+        'PRAGMA mmap_size=134217728;'  # 128 MB
+        'PRAGMA temp_store=MEMORY;'
+    ),
+}
+
+if SQLITE_PRODUCTION:
+    DATABASES['default'].update({
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+        # Keep connections open across requests
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -193,6 +281,60 @@ STATIC_URL = 'static/'
 MEDIA_ROOT = os.path.join(BASE_DIR.parent, "media/")
 MEDIA_URL = "media/"
 
+# Media serving (testskool.media.serve_media)
+# Names matching the pattern carry a content hash and are cached for a year
+MEDIA_IMMUTABLE_PATTERN = r"^profile-pictures/thumbnails/[^/]*-[0-9a-f]{12}-[^/]*$"
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# None, "x-sendfile" (Apache, lighttpd) or "x-accel-redirect" (nginx)
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE') or None
+# nginx internal location mapped to MEDIA_ROOT
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Profile picture thumbnails (pixels), made in background threads after upload
+PROFILE_THUMBNAIL_SIZES = (64, 128, 256)
+PROFILE_THUMBNAIL_WORKERS = 2
+PROFILE_THUMBNAIL_ASYNC = True
+
+# Request instrumentation (testskool.instrumentation.ServerTimingMiddleware)
+# Server-Timing response header, and queries slower than SLOW_QUERY_MS logged as warnings
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'True') == 'True'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+
+# Sampling profiler (testskool.profiling), 0 disables it
+# Profiles are merged into reports with `python manage.py aggregate_profiles`
+PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.getenv('PROFILING_DIR', BASE_DIR / 'profiles')
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '500'))
+
+# Tests use temporary THROTTLE_STORE_PATH and METRICS_STORE_PATH files (testskool.test_runner)
+TEST_RUNNER = 'testskool.test_runner.TestRunner'
+
+# Prometheus metrics (testskool.metrics), added up in this SQLite file by every worker process
+METRICS_STORE_PATH = os.getenv('METRICS_STORE_PATH', BASE_DIR / 'metrics.sqlite3')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+# Clients allowed to scrape /metrics, comma separated, none by default (disabled).
+# Checked against REMOTE_ADDR: behind a reverse proxy every client has the
+# proxy's address, so list the scraper only when it reaches the application
+# server directly (e.g. its own port) or when the proxy does not forward /metrics.
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip]
+
+# https://docs.djangoproject.com/en/5.1/topics/logging/
+# One JSON line per request on "testskool.requests" at INFO, slow query reports at WARNING
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'testskool.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
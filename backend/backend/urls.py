@@ -15,11 +15,15 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from testskool.media import serve_media
+from testskool.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('testskool/', include('testskool.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Prometheus scrape endpoint, see METRICS_ALLOWED_IPS
+    path('metrics', metrics_view, name='metrics'),
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
+]
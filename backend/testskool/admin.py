@@ -1,19 +1,49 @@
 from django.contrib import admin
 from .models import *
+from .search import SearchIndexAdminMixin
 
 # Register your models here.
 
 # User model
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
     list_display = ('username', 'is_teacher', 'is_student', 'email')  # Displaying fields
-    search_fields = ('username', 'email')  # Search for users
+    search_fields = ('username', 'email')  # Search for users, through the full-text index
+    search_index_kind = 'user'
     list_filter = ('is_teacher', 'is_student')  # Filter users
     filter_horizontal = ("subject",) # ManyToMany field control
 
+# Teachers of a subject, stored in User.subject
+class SubjectTeachersInline(admin.TabularInline):
+    model = User.subject.through
+    extra = 0
+    raw_id_fields = ('user',)
+
 # Subject model
 @admin.register(Subject)
-class SubjectAdmin(admin.ModelAdmin):
+class SubjectAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
     list_display = ('name',)
     search_fields = ('name',)
-    filter_horizontal = ('teachers',)
+    search_index_kind = 'subject'
+    inlines = (SubjectTeachersInline,)
+
+
+# Quiz model
+@admin.register(Quiz)
+class QuizAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'subject', 'quiz_owner', 'type', 'date')
+    search_fields = ('title',)
+    search_index_kind = 'quiz'
+    list_filter = ('type', 'subject')
+    raw_id_fields = ('quiz_owner',)
+
+# Question model with its choices
+class ChoiceInline(admin.TabularInline):
+    model = Choice
+    extra = 0
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = ('question', 'quiz')
+    raw_id_fields = ('quiz',)
+    inlines = (ChoiceInline,)
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class TestskoolConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'testskool'
+
+    def ready(self):
+        # Connect signal handlers
+        # https://docs.djangoproject.com/en/5.1/topics/signals/#connecting-receiver-functions
+        from . import signals  # noqa: F401
+
+        # Per-request query timing (ServerTimingMiddleware)
+        from .instrumentation import install_query_recorder
+        install_query_recorder()
@@ -0,0 +1,85 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import aprefetch_related_objects
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from .authentication import CachedJWTAuthentication
+from .catalog import aget_subject_catalog
+from .renderers import FastJSONRenderer
+from .projections import profile_data
+
+
+# ASGI-native read endpoints
+# Plain Django async views (DRF views are sync only) with the same payloads,
+# authentication and throttling as SubjectListView and MyProfileView.
+# https://docs.djangoproject.com/en/5.1/topics/async/#async-views
+
+def error_response(exc):
+    response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response["WWW-Authenticate"] = CachedJWTAuthentication().authenticate_header(None)
+    if isinstance(exc, exceptions.Throttled) and exc.wait is not None:
+        response["Retry-After"] = str(int(exc.wait))
+    return response
+
+
+async def check_request(request):
+    """ Authenticate and throttle the request, return the user """
+    result = await CachedJWTAuthentication().aauthenticate(request)
+    request.user = result[0] if result else AnonymousUser()
+
+    # The token buckets are a SQLite file that may be locked by another worker,
+    # they are updated in a thread so the event loop never waits for it
+    throttle = await sync_to_async(first_rejecting_throttle)(request)
+    if throttle is not None:
+        raise exceptions.Throttled(throttle.wait())
+    return request.user
+
+
+def first_rejecting_throttle(request):
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle
+    return None
+
+
+@require_safe
+async def subject_list(request):
+    """ List of Teacher / Quiz subjects """
+    try:
+        await check_request(request)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+
+    catalog = await aget_subject_catalog()
+    etag = f'"{catalog["etag"]}"'
+    last_modified = int(catalog["last_modified"].timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(catalog["body"], content_type="application/json")
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+async def my_profile(request):
+    """ Send user's informations """
+    try:
+        user = await check_request(request)
+        if not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+    except exceptions.APIException as exc:
+        return error_response(exc)
+
+    # Load subjects with the async ORM, profile_data() then reads the prefetch cache
+    await aprefetch_related_objects([user], "subject")
+    body = FastJSONRenderer().render(profile_data(user))
+    return HttpResponse(body, content_type="application/json")
@@ -0,0 +1,103 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# Cached user lookup for JWT authentication
+# Users are cached under their id and a per-user version, the version is bumped
+# whenever the user row is saved or deleted (see signals.py).
+# The bump only reaches the processes sharing the cache: with a per-process
+# backend (LocMemCache) other workers keep accepting a deleted or deactivated
+# user for up to AUTH_USER_CACHE_TIMEOUT seconds, so run several workers with a
+# shared cache (Redis, Memcached) only. Writes must not trust the cached
+# instance either, see UpdateProfileSerializer.update().
+AUTH_VERSION_KEY = "auth-user-version:{user_id}"
+AUTH_USER_KEY = "auth-user:{user_id}:{version}"
+
+
+def get_user_version(user_id):
+    key = AUTH_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_user_version(user_id):
+    key = AUTH_VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_cached_user(user_id):
+    cache.set(AUTH_VERSION_KEY.format(user_id=user_id), time.time_ns(), None)
+
+
+# https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html#auth-token-classes
+class CachedJWTAuthentication(JWTAuthentication):
+    """ JWTAuthentication which loads the user from the cache when possible """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = AUTH_USER_KEY.format(user_id=user_id, version=get_user_version(user_id))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        """ Same checks as JWTAuthentication.get_user """
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    # Async path for the ASGI views, header parsing and token validation do no I/O
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = AUTH_USER_KEY.format(user_id=user_id, version=await aget_user_version(user_id))
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self.check_user(user, validated_token)
+            await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        self.check_user(user, validated_token)
+        return user
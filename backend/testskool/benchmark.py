@@ -0,0 +1,223 @@
+import math
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.conf import settings
+from django.test import Client, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Subject
+
+
+# Load and latency benchmark of the testskool endpoints
+# Requests go through the whole Django stack in-process (django.test.Client),
+# from a pool of threads, each with its own database connection.
+
+BENCH_PASSWORD = "bench-password"
+SUBJECT_NAMES = [
+    "Math", "Physics", "Chemistry", "Biology", "History", "Geography", "Literature",
+    "English", "German", "French", "Spanish", "Art", "Music", "Philosophy", "Economics",
+    "Computer Science", "Physical Education", "Religion", "Sociology", "Psychology",
+]
+
+
+def seed(teachers=200, students=2000, disposable=0):
+    """ Create subjects, teachers (with subjects) and students, return the benchmark users """
+    User = get_user_model()
+    Subject.objects.bulk_create([Subject(name=name) for name in SUBJECT_NAMES])
+    subjects = list(Subject.objects.order_by("id"))
+
+    # One hash for everybody, hashing 2000 passwords would dominate the seeding time
+    password = make_password(BENCH_PASSWORD)
+    users = [
+        User(username=f"bench-teacher-{i}", password=password, first_name="Teacher", last_name=str(i),
+             about="Teaches " * 20, is_teacher=True)
+        for i in range(teachers)
+    ] + [
+        User(username=f"bench-student-{i}", password=password, first_name="Student", last_name=str(i),
+             is_student=True)
+        for i in range(students + disposable)
+    ]
+    User.objects.bulk_create(users, batch_size=1000)
+
+    teacher_ids = User.objects.filter(is_teacher=True, username__startswith="bench-teacher-").values_list("id", flat=True)
+    User.subject.through.objects.bulk_create([
+        User.subject.through(user_id=user_id, subject_id=subjects[(user_id + k) % len(subjects)].id)
+        for user_id in teacher_ids
+        for k in range(3)
+    ], batch_size=1000, ignore_conflicts=True)
+
+    return {
+        "teachers": list(User.objects.filter(username__startswith="bench-teacher-").order_by("id")),
+        "students": list(User.objects.filter(username__startswith="bench-student-").order_by("id")[:students]),
+        "disposable": list(User.objects.filter(username__startswith="bench-student-").order_by("id")[students:]),
+    }
+
+
+def percentile(values, p):
+    """ Nearest-rank percentile of a sorted list """
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def auth_headers(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+def build_scenarios(users):
+    """ Map of endpoint name to a function making its i-th request """
+    students = users["students"]
+    teachers = users["teachers"]
+    disposable = users["disposable"]
+    tokens = {}
+
+    def headers(user):
+        if user.pk not in tokens:
+            tokens[user.pk] = auth_headers(user)
+        return tokens[user.pk]
+
+    refresh_tokens = [str(RefreshToken.for_user(user)) for user in students[:50]]
+    for user in students + teachers:
+        headers(user)
+
+    return {
+        "subject-list": lambda client, i: client.get(reverse("subject-list")),
+        "token_obtain_pair": lambda client, i: client.post(
+            reverse("token_obtain_pair"),
+            {"username": students[i % len(students)].username, "password": BENCH_PASSWORD},
+            content_type="application/json",
+        ),
+        "token_refresh": lambda client, i: client.post(
+            reverse("token_refresh"),
+            {"refresh": refresh_tokens[i % len(refresh_tokens)]},
+            content_type="application/json",
+        ),
+        "register": lambda client, i: client.post(
+            reverse("register"),
+            {"username": f"bench-new-{time.time_ns()}-{i}", "password": BENCH_PASSWORD,
+             "confirm": BENCH_PASSWORD, "is_teacher": False},
+            content_type="application/json",
+        ),
+        "my-profile": lambda client, i: client.get(
+            reverse("my-profile"), **headers(teachers[i % len(teachers)])
+        ),
+        "edit-profile": lambda client, i: client.put(
+            reverse("edit-profile"),
+            encode_multipart(BOUNDARY, {"first_name": f"Name {i}"}),
+            content_type=MULTIPART_CONTENT,
+            **headers(students[i % len(students)]),
+        ),
+        "delete-account": lambda client, i: client.delete(
+            reverse("delete-account"),
+            {"password": BENCH_PASSWORD},
+            content_type="application/json",
+            **headers(disposable[i]),
+        ),
+    }
+
+
+def run_endpoint(request, requests, concurrency):
+    """ Send `requests` requests from `concurrency` threads, return the endpoint statistics """
+    latencies = []
+    queries = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        client = Client()
+        local_latencies, local_queries, local_errors = [], [], []
+        count = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            with connection.execute_wrapper(count_queries):
+                while True:
+                    with lock:
+                        i = next(counter, None)
+                    if i is None:
+                        break
+                    count[0] = 0
+                    start = time.perf_counter()
+                    response = request(client, i)
+                    local_latencies.append(time.perf_counter() - start)
+                    local_queries.append(count[0])
+                    if response.status_code >= 400:
+                        local_errors.append(response.status_code)
+        finally:
+            connection.close()
+
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors.extend(local_errors)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(requests=200, concurrency=8, endpoints=None, teachers=200, students=2000, throttle=False):
+    """ Seed the (empty) database and benchmark every endpoint """
+    users = seed(teachers=teachers, students=students, disposable=requests)
+    scenarios = build_scenarios(users)
+    endpoints = endpoints or list(scenarios)
+
+    results = {}
+    # Throttling would turn most of the load into 429 responses
+    rates = {} if throttle else {scope: None for scope in SimpleRateThrottle.THROTTLE_RATES}
+    hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, rates), override_settings(ALLOWED_HOSTS=hosts):
+        for name in endpoints:
+            results[name] = run_endpoint(scenarios[name], requests, concurrency)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """ Return a list of regressions of `results` against `baseline` """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current["rps"] < previous["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: {previous['rps']} -> {current['rps']} requests/sec")
+        if current["queries_per_request"] > previous["queries_per_request"]:
+            regressions.append(
+                f"{name}: {previous['queries_per_request']} -> {current['queries_per_request']} queries/request"
+            )
+    return regressions
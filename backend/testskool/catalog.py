@@ -0,0 +1,104 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from django.core.cache import cache
+from .models import CacheVersion, Subject
+from .projections import SUBJECT_FIELDS, subject_list
+from .renderers import FastJSONRenderer
+
+
+# Subject catalog caching
+# The catalog only changes when an admin edits subjects, so the rendered
+# JSON body is kept in the cache under the current catalog version.
+# The version is a CacheVersion row, changed in the same transaction as the
+# subjects (signals.py), so every worker process sees it even with a
+# per-process cache. Serving the cached catalog costs a primary key lookup.
+# https://docs.djangoproject.com/en/5.1/topics/cache/#the-low-level-cache-api
+CATALOG_VERSION = "subject-catalog"
+CATALOG_BODY_KEY = "subject-catalog:{version}"
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+
+def get_catalog_version():
+    """ Return the current catalog version (a nanosecond timestamp) """
+    versions = CacheVersion.objects.filter(name=CATALOG_VERSION).values_list("version", flat=True)
+    version = versions.first()
+    if version is None:
+        # Keeps a version created concurrently by another request
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(name=CATALOG_VERSION, version=time.time_ns())], ignore_conflicts=True,
+        )
+        version = versions.first()
+    return version
+
+
+def bump_catalog_version():
+    """ Invalidate the cached catalog """
+    CacheVersion.objects.bulk_create(
+        [CacheVersion(name=CATALOG_VERSION, version=time.time_ns())],
+        update_conflicts=True, unique_fields=["name"], update_fields=["version"],
+    )
+
+
+def build_catalog(data, version):
+    body = FastJSONRenderer().render(data)
+    return {
+        "data": data,
+        "body": body,
+        "etag": hashlib.sha256(body).hexdigest(),
+        "last_modified": datetime.fromtimestamp(version / 1e9, tz=timezone.utc),
+    }
+
+
+def get_subject_catalog():
+    """ Return the serialized subject list with its ETag and modification time """
+    version = get_catalog_version()
+    key = CATALOG_BODY_KEY.format(version=version)
+    catalog = cache.get(key)
+
+    if catalog is None:
+        catalog = build_catalog(subject_list(Subject.objects.all().order_by("name")), version)
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+
+    return catalog
+
+
+# Async variants for the ASGI views (async_views.py), same cache entries as above
+# https://docs.djangoproject.com/en/5.1/topics/async/#queries-the-orm
+async def aget_catalog_version():
+    versions = CacheVersion.objects.filter(name=CATALOG_VERSION).values_list("version", flat=True)
+    version = await versions.afirst()
+    if version is None:
+        await CacheVersion.objects.abulk_create(
+            [CacheVersion(name=CATALOG_VERSION, version=time.time_ns())], ignore_conflicts=True,
+        )
+        version = await versions.afirst()
+    return version
+
+
+async def aget_subject_catalog():
+    version = await aget_catalog_version()
+    key = CATALOG_BODY_KEY.format(version=version)
+    catalog = await cache.aget(key)
+
+    if catalog is None:
+        subjects = [subject async for subject in Subject.objects.all().order_by("name").values(*SUBJECT_FIELDS)]
+        catalog = build_catalog(subjects, version)
+        await cache.aset(key, catalog, CATALOG_TIMEOUT)
+
+    return catalog
+
+
+def request_catalog(request):
+    """ get_subject_catalog() once per request, for the validators and the body """
+    if not hasattr(request, "subject_catalog"):
+        request.subject_catalog = get_subject_catalog()
+    return request.subject_catalog
+
+
+def catalog_etag(request, *args, **kwargs):
+    return request_catalog(request)["etag"]
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return request_catalog(request)["last_modified"]
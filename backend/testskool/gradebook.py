@@ -0,0 +1,53 @@
+import csv
+from django.conf import settings
+
+
+# Grade book export
+# Solutions are read as value tuples with iterator(chunk_size), and every CSV
+# line is yielded as soon as it is written, so a StreamingHttpResponse starts
+# sending right away and the worker never holds more than one chunk.
+# https://docs.djangoproject.com/en/5.1/howto/outputting-csv/#streaming-large-csv-files
+
+GRADEBOOK_COLUMNS = [
+    ("date", "date"),
+    ("student_id", "student_id"),
+    ("username", "student__username"),
+    ("first_name", "student__first_name"),
+    ("last_name", "student__last_name"),
+    ("subject", "solved_quiz__subject__name"),
+    ("quiz_id", "solved_quiz_id"),
+    ("quiz", "solved_quiz__title"),
+    ("question_id", "solved_question_id"),
+    ("answer", "student_answer__choice"),
+    ("result", "is_correct"),
+]
+RESULTS = {True: "correct", False: "wrong", None: "ungraded"}
+# Spreadsheets run cells starting with these as formulas
+# https://owasp.org/www-community/attacks/CSV_Injection
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def cell(value):
+    """ Free text as a literal cell, quoted with a leading ' if it could be a formula """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class Echo:
+    """ File-like object returning what is written instead of storing it """
+
+    def write(self, value):
+        return value
+
+
+def gradebook_lines(solutions, chunk_size=None):
+    """ Yield the CSV lines of a StudentSolution queryset, header first """
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in GRADEBOOK_COLUMNS])
+
+    rows = solutions.order_by("id").values_list(*[field for _, field in GRADEBOOK_COLUMNS])
+    for row in rows.iterator(chunk_size=chunk_size or settings.GRADEBOOK_CHUNK_SIZE):
+        *values, is_correct = row
+        values[0] = values[0].isoformat()
+        yield writer.writerow([*map(cell, values), RESULTS[is_correct]])
@@ -0,0 +1,121 @@
+from collections import Counter
+from django.conf import settings
+from django.db import connection, transaction
+from django.dispatch import Signal
+from .models import Answer, StudentSolution
+
+
+# Batch grading of StudentSolution rows
+# The answer key of a quiz is loaded once, submissions are read as plain value
+# tuples in chunks, compared against the key in a tight loop and written back
+# with one UPDATE per outcome and chunk instead of one save() per answer.
+
+# Sent after each graded batch with quiz_id, results and questions:
+#   {student_id: {"correct": n, "answered": n, "graded": n}}
+#   {question_id: {"correct": n, "answered": n, "graded": n}}
+solutions_graded = Signal()
+
+
+class AnswerKey:
+    """ question id -> correct choice id of one quiz """
+
+    def __init__(self, quiz_id):
+        self.quiz_id = quiz_id
+        self.key = dict(
+            Answer.objects.filter(question__quiz_id=quiz_id).values_list("question_id", "answer_id")
+        )
+
+    def grade(self, rows):
+        """
+        Grade (id, student_id, question_id, choice_id) rows.
+        Returns (correct ids, wrong ids, per-student results, per-question results).
+        """
+        key = self.key
+        correct, wrong = [], []
+        results = {}
+        questions = {}
+        for solution_id, student_id, question_id, choice_id in rows:
+            result = results.get(student_id)
+            if result is None:
+                result = results[student_id] = Counter()
+            question = questions.get(question_id)
+            if question is None:
+                question = questions[question_id] = Counter()
+            result["graded"] += 1
+            question["graded"] += 1
+            if choice_id is not None:
+                result["answered"] += 1
+                question["answered"] += 1
+            if choice_id is not None and key.get(question_id) == choice_id:
+                correct.append(solution_id)
+                result["correct"] += 1
+                question["correct"] += 1
+            else:
+                wrong.append(solution_id)
+        return (
+            correct,
+            wrong,
+            {student_id: _result(result) for student_id, result in results.items()},
+            {question_id: _result(question) for question_id, question in questions.items()},
+        )
+
+
+def _result(counter):
+    return {"correct": counter["correct"], "answered": counter["answered"], "graded": counter["graded"]}
+
+
+# Only rows still ungraded are written, RETURNING tells which ones that were
+UPDATE_SQL = "UPDATE {table} SET is_correct = %s WHERE is_correct IS NULL AND id IN ({ids}) RETURNING id"
+
+
+def _update(ids, is_correct):
+    """ Grade the still ungraded solutions of `ids`, return the ids graded here """
+    table = connection.ops.quote_name(StudentSolution._meta.db_table)
+    updated = set()
+    # Stay well below SQLite's bound parameter limit
+    step = settings.GRADING_UPDATE_CHUNK
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), step):
+            chunk = ids[start:start + step]
+            cursor.execute(UPDATE_SQL.format(table=table, ids=", ".join(["%s"] * len(chunk))), [is_correct, *chunk])
+            updated.update(row[0] for row in cursor.fetchall())
+    return updated
+
+
+def grade_quiz(quiz_id, students=None, batch_size=None):
+    """
+    Grade every ungraded solution of a quiz (optionally only of `students`).
+    Returns {student_id: {"correct": n, "answered": n, "graded": n}}.
+    """
+    batch_size = batch_size or settings.GRADING_BATCH_SIZE
+    answer_key = AnswerKey(quiz_id)
+
+    solutions = StudentSolution.objects.filter(solved_quiz_id=quiz_id, is_correct__isnull=True)
+    if students is not None:
+        solutions = solutions.filter(student_id__in=students)
+
+    totals = {}
+    while True:
+        # Graded rows drop out of the filter, so the first batch is always the next one
+        with transaction.atomic():
+            rows = list(
+                solutions.order_by("id").values_list("id", "student_id", "solved_question_id", "student_answer_id")[:batch_size]
+            )
+            if not rows:
+                break
+            correct, wrong, results, questions = answer_key.grade(rows)
+            updated = _update(correct, True) | _update(wrong, False)
+            if len(updated) < len(rows):
+                # A grading run overlapping this one graded some of them, count only ours
+                rows = [row for row in rows if row[0] in updated]
+                _, _, results, questions = answer_key.grade(rows)
+
+            # Receivers update their aggregates in the same transaction
+            if results:
+                solutions_graded.send(sender=StudentSolution, quiz_id=quiz_id, results=results, questions=questions)
+
+        for student_id, result in results.items():
+            total = totals.setdefault(student_id, Counter())
+            total.update(result)
+
+    return {student_id: _result(total) for student_id, total in totals.items()}
@@ -0,0 +1,107 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+from .authentication import invalidate_cached_user
+from .models import User
+
+
+logger = logging.getLogger(__name__)
+
+# Profile picture thumbnails
+# Square WebP and JPEG derivatives of every uploaded profile picture, made after
+# the edit-profile request has returned. Pillow only writes metadata (EXIF, ICC)
+# when it is passed explicitly, so the derivatives carry none.
+# https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html
+THUMBNAIL_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+THUMBNAIL_DIR = "profile-pictures/thumbnails"
+
+executor = ThreadPoolExecutor(max_workers=settings.PROFILE_THUMBNAIL_WORKERS, thread_name_prefix="thumbnails")
+
+
+def render_thumbnails(image):
+    """ Yield (size, extension, bytes) for every configured size and format """
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    for size in settings.PROFILE_THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        for extension, options in THUMBNAIL_FORMATS.items():
+            frame = thumbnail
+            if options["format"] == "JPEG" and frame.mode != "RGB":
+                # JPEG has no alpha channel, flatten on white
+                background = Image.new("RGB", frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.getchannel("A"))
+                frame = background
+            buffer = BytesIO()
+            frame.save(buffer, **options)
+            yield size, extension, buffer.getvalue()
+
+
+def delete_thumbnails(thumbnails):
+    for formats in (thumbnails or {}).values():
+        for name in formats.values():
+            default_storage.delete(name)
+
+
+def make_thumbnails(user_id):
+    """ Build the thumbnails of a user's current profile picture """
+    user = User.objects.filter(pk=user_id).only("profile_picture", "profile_thumbnails").first()
+    if not user or not user.profile_picture:
+        return None
+
+    picture = user.profile_picture.name
+    try:
+        with user.profile_picture.open("rb") as f:
+            content = f.read()
+        with Image.open(BytesIO(content)) as image:
+            image.load()
+            rendered = list(render_thumbnails(image))
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.warning("Cannot make thumbnails of %s", picture, exc_info=True)
+        return None
+
+    # Content hashed names, a new picture never reuses an old URL
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    thumbnails = {}
+    for size, extension, data in rendered:
+        name = default_storage.save(f"{THUMBNAIL_DIR}/{user_id}-{digest}-{size}.{extension}", ContentFile(data))
+        thumbnails.setdefault(str(size), {})[extension] = name
+
+    # Only keep them if the picture was not replaced meanwhile
+    updated = User.objects.filter(pk=user_id, profile_picture=picture).update(profile_thumbnails=thumbnails)
+    if not updated:
+        delete_thumbnails(thumbnails)
+        return None
+
+    delete_thumbnails(user.profile_thumbnails)
+    invalidate_cached_user(user_id)
+    return thumbnails
+
+
+def _make_thumbnails_in_thread(user_id):
+    try:
+        return make_thumbnails(user_id)
+    finally:
+        # Worker threads get their own database connection
+        connection.close()
+
+
+def schedule_thumbnails(user_id):
+    """ Make thumbnails once the current transaction is committed """
+    def run():
+        if settings.PROFILE_THUMBNAIL_ASYNC:
+            executor.submit(_make_thumbnails_in_thread, user_id)
+        else:
+            make_thumbnails(user_id)
+
+    transaction.on_commit(run)
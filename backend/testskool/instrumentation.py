@@ -0,0 +1,221 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from . import metrics as prometheus
+
+
+logger = logging.getLogger("testskool.requests")
+
+# Per-request instrumentation
+# Queries are timed by an execute wrapper installed on every database
+# connection and cache lookups by wrapping get() / get_many() of the cache
+# backend instances (whatever the backend is). Both add to the
+# metrics of the current request, found through a context variable so that
+# queries run by sync_to_async threads of async views are counted too.
+# Streaming responses are logged once their content is sent, with the queries
+# run while it is generated; their Server-Timing header can only tell what
+# happened before the headers were sent.
+# https://docs.djangoproject.com/en/5.1/topics/db/instrumentation/
+# https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Server-Timing
+
+_metrics = ContextVar("request_metrics", default=None)
+_MISSING = object()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.slow_queries = []
+        self.view_start = None
+        self.view_time = 0.0
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            self.slow_queries.append((round(duration * 1000, 2), sql))
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - start)
+
+
+def _install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorder():
+    """ Time the queries of every current and future database connection """
+    connection_created.connect(lambda sender, connection, **kwargs: _install(connection), weak=False)
+    for connection in connections.all(initialized_only=True):
+        _install(connection)
+
+
+def instrument_cache(backend):
+    """ Count the hits and misses of the current request on a cache backend instance """
+    if getattr(backend, "instrumented", False):
+        return
+    get, get_many = backend.get, backend.get_many
+
+    def instrumented_get(key, default=None, version=None):
+        value = get(key, _MISSING, version)
+        metrics = _metrics.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def instrumented_get_many(keys, version=None):
+        keys = list(keys)
+        found = get_many(keys, version)
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+
+    # The async methods of BaseCache run these through sync_to_async
+    backend.get, backend.get_many = instrumented_get, instrumented_get_many
+    backend.instrumented = True
+
+
+class ServerTimingMiddleware:
+    """ Report query count, DB, view and total time, cache hits / misses of every request """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs a sync process_view of an async chain in a thread
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Backend instances are per thread / async context, created on first use
+        instrument_cache(caches["default"])
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        instrument_cache(caches["default"])
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    # This middleware comes first, so the view middleware of the others and
+    # the view itself (with the rendering of DRF responses) are the view time
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        start_view()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        start_view()
+
+    def finish(self, request, response, metrics):
+        if metrics.view_start is not None:
+            metrics.view_time = time.perf_counter() - metrics.view_start
+
+        if settings.SERVER_TIMING:
+            # Streaming responses send their headers before the content (and its queries)
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+                f'cache;desc="hits={metrics.cache_hits} misses={metrics.cache_misses}"',
+                f"view;dur={metrics.view_time * 1000:.2f}",
+                f"total;dur={(time.perf_counter() - metrics.start) * 1000:.2f}",
+            ])
+
+        if response.streaming and not response.is_async:
+            # Reported once the content is sent, the queries it runs included
+            response.streaming_content = measure_stream(
+                response.streaming_content, metrics, lambda: report(request, response, metrics),
+            )
+        else:
+            report(request, response, metrics)
+        return response
+
+
+def start_view():
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.view_start = time.perf_counter()
+
+
+def measure_stream(content, metrics, done):
+    """ Iterate `content` in the metrics context of its request, call done() at the end """
+    try:
+        iterator = iter(content)
+        while True:
+            token = _metrics.set(metrics)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _metrics.reset(token)
+            yield chunk
+    finally:
+        done()
+
+
+def report(request, response, metrics):
+    """ Log line and Prometheus metrics of a finished request """
+    total = (time.perf_counter() - metrics.start) * 1000
+    db_time = metrics.db_time * 1000
+
+    match = getattr(request, "resolver_match", None)
+    url_name = match.view_name if match else "unresolved"
+    prometheus.request_duration.observe(
+        total / 1000, url_name=url_name, method=request.method, status=response.status_code,
+    )
+    prometheus.db_queries.inc(metrics.queries, url_name=url_name)
+    prometheus.db_query_duration.inc(metrics.db_time, url_name=url_name)
+    prometheus.cache_requests.inc(metrics.cache_hits, result="hit")
+    prometheus.cache_requests.inc(metrics.cache_misses, result="miss")
+
+    line = {
+        "url_name": match.view_name if match else None,
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "total_ms": round(total, 2),
+        "view_ms": round(metrics.view_time * 1000, 2),
+        "queries": metrics.queries,
+        "db_ms": round(db_time, 2),
+        "cache_hits": metrics.cache_hits,
+        "cache_misses": metrics.cache_misses,
+    }
+    logger.info(json.dumps(line))
+    if metrics.slow_queries:
+        line["slow_queries"] = [{"ms": ms, "sql": sql[:1000]} for ms, sql in metrics.slow_queries]
+        logger.warning(json.dumps(line))
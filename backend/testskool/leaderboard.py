@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from sortedcontainers import SortedList
+from .models import CacheVersion, Quiz, QuizResult, SubjectScore
+
+
+# Per-subject leaderboards
+# SubjectScore holds every student's total of correct answers per subject and is
+# updated in the grading transaction. Each process keeps all scores in sorted
+# lists, loaded on first use, so top N and rank lookups are O(log n) without
+# touching the database. Scores changed by other processes are picked up by a
+# sync of the recently updated rows at most every LEADERBOARD_SYNC_INTERVAL seconds.
+# Removed rows (deleted students or subjects, rebuilds) cannot be seen that
+# way, removing them bumps the leaderboard generation, a CacheVersion row,
+# and a sync seeing a new generation loads everything again.
+# https://grantjenks.com/docs/sortedcontainers/sortedlist.html
+
+# Rows are re-read for this long after a sync, to catch transactions that
+# were still running when it happened (applying a score twice is harmless)
+SYNC_OVERLAP = timedelta(minutes=1)
+LEADERBOARD_GENERATION = "leaderboards"
+
+
+def get_generation():
+    return CacheVersion.objects.filter(name=LEADERBOARD_GENERATION).values_list("version", flat=True).first()
+
+
+def bump_generation():
+    """ Make every process load its leaderboards again, after scores were removed """
+    CacheVersion.objects.bulk_create(
+        [CacheVersion(name=LEADERBOARD_GENERATION, version=time.time_ns())],
+        update_conflicts=True, unique_fields=["name"], update_fields=["version"],
+    )
+
+
+class Leaderboard:
+    """ Scores of one subject, best first """
+
+    def __init__(self):
+        self.scores = {}
+        # (-score, student_id), ties are ordered by student id
+        self.ranking = SortedList()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set(self, student_id, score):
+        previous = self.scores.get(student_id)
+        if previous is not None:
+            self.ranking.remove((-previous, student_id))
+        self.scores[student_id] = score
+        self.ranking.add((-score, student_id))
+
+    def discard(self, student_id):
+        score = self.scores.pop(student_id, None)
+        if score is not None:
+            self.ranking.remove((-score, student_id))
+
+    def rank_of_score(self, score):
+        # Students with the same score share a rank (1, 2, 2, 4)
+        return self.ranking.bisect_left((-score, 0)) + 1
+
+    def top(self, count):
+        """ [(rank, student_id, score)] of the first `count` students """
+        return [
+            (self.rank_of_score(-negative), student_id, -negative)
+            for negative, student_id in self.ranking.islice(0, count)
+        ]
+
+    def rank(self, student_id):
+        """ (rank, score) of a student, None if not ranked """
+        score = self.scores.get(student_id)
+        if score is None:
+            return None
+        return self.rank_of_score(score), score
+
+
+class Leaderboards:
+    """ Leaderboards of every subject in this process """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """ Drop everything, the next lookup loads the leaderboards again """
+        with self.lock:
+            self.boards = defaultdict(Leaderboard)
+            self.loaded = False
+            self.synced = None
+            self.next_sync = 0
+            self.generation = None
+
+    def _load(self):
+        self.boards = defaultdict(Leaderboard)
+        self.synced = timezone.now()
+        # Read first, removals while loading are seen by the next sync
+        self.generation = get_generation()
+        rows = SubjectScore.objects.values_list("subject_id", "student_id", "score")
+        for subject_id, student_id, score in rows.iterator(chunk_size=10000):
+            self.boards[subject_id].set(student_id, score)
+        self.loaded = True
+        self.next_sync = time.monotonic() + settings.LEADERBOARD_SYNC_INTERVAL
+
+    def _sync(self):
+        if get_generation() != self.generation:
+            self._load()
+            return
+        since, self.synced = self.synced - SYNC_OVERLAP, timezone.now()
+        rows = SubjectScore.objects.filter(updated__gte=since).values_list("subject_id", "student_id", "score")
+        for subject_id, student_id, score in rows:
+            self.boards[subject_id].set(student_id, score)
+        self.next_sync = time.monotonic() + settings.LEADERBOARD_SYNC_INTERVAL
+
+    def _ready(self):
+        if not self.loaded:
+            self._load()
+        elif time.monotonic() >= self.next_sync:
+            self._sync()
+
+    def top(self, subject_id, count):
+        with self.lock:
+            self._ready()
+            board = self.boards.get(subject_id)
+            return board.top(count) if board else []
+
+    def rank(self, subject_id, student_id):
+        with self.lock:
+            self._ready()
+            board = self.boards.get(subject_id)
+            return board.rank(student_id) if board else None
+
+    def size(self, subject_id):
+        with self.lock:
+            self._ready()
+            board = self.boards.get(subject_id)
+            return len(board) if board else 0
+
+    def update(self, rows):
+        """ Apply (subject_id, student_id, score) rows, if already loaded """
+        with self.lock:
+            if self.loaded:
+                for subject_id, student_id, score in rows:
+                    self.boards[subject_id].set(student_id, score)
+
+    def remove_student(self, student_id):
+        with self.lock:
+            for board in self.boards.values():
+                board.discard(student_id)
+
+
+leaderboards = Leaderboards()
+
+
+def apply_graded_scores(quiz_id, results):
+    """ Add one graded batch to the subject scores """
+    subject_id = Quiz.objects.filter(pk=quiz_id).values_list("subject_id", flat=True).first()
+    if subject_id is None:
+        return
+
+    now = timezone.now()
+    SubjectScore.objects.bulk_create(
+        [SubjectScore(subject_id=subject_id, student_id=student_id, updated=now) for student_id in results],
+        ignore_conflicts=True,
+    )
+    # One UPDATE per distinct number of correct answers
+    by_delta = defaultdict(list)
+    for student_id, result in results.items():
+        by_delta[result["correct"]].append(student_id)
+    for delta, student_ids in by_delta.items():
+        SubjectScore.objects.filter(subject_id=subject_id, student_id__in=student_ids).update(
+            score=F("score") + delta, updated=now
+        )
+
+    student_ids = list(results)
+
+    def refresh():
+        rows = SubjectScore.objects.filter(subject_id=subject_id, student_id__in=student_ids)
+        leaderboards.update(rows.values_list("subject_id", "student_id", "score"))
+
+    transaction.on_commit(refresh)
+
+
+@transaction.atomic
+def rebuild_subject_scores():
+    """ Recompute every subject score from the quiz results """
+    now = timezone.now()
+    totals = QuizResult.objects.values("quiz__subject_id", "student_id").annotate(total=Sum("correct")).order_by()
+
+    SubjectScore.objects.all().delete()
+    bump_generation()
+    SubjectScore.objects.bulk_create(
+        [
+            SubjectScore(subject_id=row["quiz__subject_id"], student_id=row["student_id"], score=row["total"], updated=now)
+            for row in totals
+        ],
+        batch_size=1000,
+    )
+    transaction.on_commit(leaderboards.clear)
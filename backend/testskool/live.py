@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+import re
+from collections import Counter
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import exceptions
+from .authentication import CachedJWTAuthentication
+from .grading import grade_quiz
+from .models import Quiz, StudentSolution
+from .quiz_payload import get_quiz_payload
+
+
+logger = logging.getLogger(__name__)
+
+# Live quiz sessions over WebSockets
+# A plain ASGI WebSocket application (backend/asgi.py routes websocket scopes
+# here), one session per quiz at ws/live/<quiz id>/?token=<access token>.
+# The quiz owner hosts it: {"action": "start" | "next" | "end"}, students
+# answer the current question: {"action": "answer", "choice": <choice id>}.
+# Messages fan out through per-connection queues of the session, which lives
+# in this process, so live sessions need a single ASGI worker process.
+# Answers are written in batches and graded when the session ends or everybody
+# leaves; a new session of the quiz starts from the answers already stored, so
+# nobody answers a question twice.
+# https://asgi.readthedocs.io/en/latest/specs/www.html#websocket
+LIVE_PATH_RE = re.compile(r"^/ws/live/(?P<quiz_id>\d+)/$")
+
+# Close codes, 4000-4999 are free for applications
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_TOO_SLOW = 4408
+
+
+class Subscriber:
+    """ One connection of a session """
+
+    def __init__(self, user_id, is_host, is_student):
+        self.user_id = user_id
+        self.is_host = is_host
+        self.is_student = is_student
+        self.queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+
+    def push(self, message):
+        """ Queue a message, a client too slow to keep up is disconnected """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+        return True
+
+
+class LiveSession:
+    """ State of a live quiz, shared by its connections """
+
+    def __init__(self, quiz_id, owner_id, questions, answers=None):
+        self.quiz_id = quiz_id
+        self.owner_id = owner_id
+        self.questions = questions
+        self.index = -1
+        self.status = "waiting"
+        self.subscribers = set()
+        # question id -> {student id: choice id}, including earlier sessions
+        self.answers = answers or {}
+        # Saving and grading of the answers, started by end()
+        self.ending = None
+        self.pending = []
+        self.tally_scheduled = False
+        self.flusher = None
+        # Flushes started when LIVE_FLUSH_SIZE answers are queued
+        self.flushes = set()
+
+    @property
+    def question(self):
+        return self.questions[self.index] if self.status == "running" else None
+
+    def publish(self, message, hosts_only=False):
+        text = json.dumps(message)
+        for subscriber in list(self.subscribers):
+            if hosts_only and not subscriber.is_host:
+                continue
+            if not subscriber.push(text):
+                self.subscribers.discard(subscriber)
+
+    def state(self):
+        question = self.question
+        return {
+            "type": "state",
+            "status": self.status,
+            "index": self.index,
+            "count": len(self.questions),
+            "question": question,
+            "participants": sum(1 for subscriber in self.subscribers if not subscriber.is_host),
+        }
+
+    def tally(self):
+        question = self.question
+        if question is None:
+            return None
+        answers = self.answers.get(question["id"], {})
+        return {
+            "type": "tally",
+            "question": question["id"],
+            "answers": len(answers),
+            "choices": {str(choice): count for choice, count in Counter(answers.values()).items()},
+        }
+
+    def schedule_tally(self):
+        # Coalesce bursts of answers into one tally per interval
+        if self.tally_scheduled:
+            return
+        self.tally_scheduled = True
+
+        def publish():
+            self.tally_scheduled = False
+            tally = self.tally()
+            if tally:
+                self.publish(tally, hosts_only=True)
+
+        asyncio.get_running_loop().call_later(settings.LIVE_TALLY_INTERVAL, publish)
+
+    # Host actions
+    def start(self):
+        if self.status != "waiting" or not self.questions:
+            raise ValueError("The session cannot be started.")
+        self.status, self.index = "running", 0
+        self.flusher = asyncio.create_task(self.flush_periodically())
+        self.publish(self.state())
+
+    def next(self):
+        if self.status != "running":
+            raise ValueError("The session is not running.")
+        if self.index + 1 >= len(self.questions):
+            raise ValueError("This is the last question.")
+        self.index += 1
+        self.publish(self.state())
+
+    async def end(self):
+        """ End the session, save and grade its answers (once, whoever calls first) """
+        if self.ending is None:
+            self.status = "ended"
+            self.ending = asyncio.ensure_future(self.save_and_grade())
+        await asyncio.shield(self.ending)
+        self.publish(self.state())
+
+    async def save_and_grade(self):
+        try:
+            await self.close()
+            # Grading skips graded rows, answers of earlier sessions are not counted twice
+            students = {student_id for answers in self.answers.values() for student_id in answers}
+            if students:
+                await sync_to_async(grade_quiz)(self.quiz_id, students=list(students))
+        except Exception:
+            logger.exception("Cannot save or grade the answers of live quiz %s", self.quiz_id)
+
+    # Student actions
+    def answer(self, student_id, choice_id):
+        question = self.question
+        if question is None:
+            raise ValueError("No question is open.")
+        if choice_id not in {choice["id"] for choice in question["choices"]}:
+            raise ValueError("Not a choice of the current question.")
+        answers = self.answers.setdefault(question["id"], {})
+        if student_id in answers:
+            raise ValueError("Already answered.")
+
+        answers[student_id] = choice_id
+        self.pending.append(StudentSolution(
+            student_id=student_id, solved_quiz_id=self.quiz_id,
+            solved_question_id=question["id"], student_answer_id=choice_id,
+        ))
+        if len(self.pending) >= settings.LIVE_FLUSH_SIZE:
+            task = asyncio.create_task(self.flush())
+            self.flushes.add(task)
+            task.add_done_callback(self.flushes.discard)
+        self.schedule_tally()
+        return question["id"]
+
+    async def flush(self):
+        """ Write the queued answers with one bulk INSERT """
+        pending, self.pending = self.pending, []
+        if pending:
+            await StudentSolution.objects.abulk_create(pending)
+
+    async def close(self):
+        """ Stop the periodic flush and save everything queued """
+        if self.flusher:
+            self.flusher.cancel()
+        if self.flushes:
+            await asyncio.gather(*self.flushes)
+        await self.flush()
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(settings.LIVE_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Cannot save the answers of live quiz %s", self.quiz_id)
+
+
+# quiz id -> LiveSession of this process
+sessions = {}
+
+
+async def stored_answers(quiz_id):
+    """ {question id: {student id: choice id}} of the answers already saved """
+    answers = {}
+    rows = StudentSolution.objects.filter(solved_quiz_id=quiz_id).values_list(
+        "solved_question_id", "student_id", "student_answer_id"
+    )
+    async for question_id, student_id, choice_id in rows:
+        answers.setdefault(question_id, {})[student_id] = choice_id
+    return answers
+
+
+async def get_session(quiz_id):
+    session = sessions.get(quiz_id)
+    if session is None or session.status == "ended":
+        if session is not None:
+            # The next session reads the answers of this one once they are saved
+            await asyncio.shield(session.ending)
+        quiz = await Quiz.objects.filter(pk=quiz_id).values("id", "quiz_owner_id").afirst()
+        if quiz is None:
+            return None
+        # The same pre-rendered tree as the quiz detail endpoint, without answers
+        payload = await sync_to_async(get_quiz_payload)(quiz_id)
+        if payload is None:
+            # Deleted meanwhile
+            return None
+        answers = await stored_answers(quiz_id)
+        current = sessions.get(quiz_id)
+        if current is not None and current is not session and current.status != "ended":
+            # Created by another connection meanwhile
+            return current
+        session = sessions[quiz_id] = LiveSession(
+            quiz_id, quiz["quiz_owner_id"], payload["data"]["questions"], answers,
+        )
+    return session
+
+
+async def authenticate(scope):
+    """ User of the access token in the query string, None if missing or invalid """
+    # Browsers cannot set headers on WebSocket connections
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    if not token:
+        return None
+    authentication = CachedJWTAuthentication()
+    try:
+        return await authentication.aget_user(authentication.get_validated_token(token[0]))
+    except exceptions.APIException:
+        return None
+
+
+async def handle_message(session, subscriber, text):
+    try:
+        message = json.loads(text)
+    except ValueError:
+        message = None
+    if not isinstance(message, dict) or "action" not in message:
+        return {"type": "error", "detail": "Send a JSON object with an action."}
+    action = message["action"]
+
+    try:
+        if subscriber.is_host and action == "start":
+            session.start()
+        elif subscriber.is_host and action == "next":
+            session.next()
+        elif subscriber.is_host and action == "end":
+            await session.end()
+        elif not subscriber.is_host and action == "answer":
+            if not subscriber.is_student:
+                raise ValueError("Only students can answer.")
+            choice = message.get("choice")
+            if not isinstance(choice, int):
+                raise ValueError("A valid integer is required.")
+            return {"type": "answered", "question": session.answer(subscriber.user_id, choice)}
+        else:
+            return {"type": "error", "detail": f'Unknown action "{action}".'}
+    except ValueError as e:
+        return {"type": "error", "detail": str(e)}
+    return None
+
+
+async def live_application(scope, receive, send):
+    """ ASGI application of the live quiz WebSockets """
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    match = LIVE_PATH_RE.match(scope["path"])
+    if not match:
+        await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        return
+    user = await authenticate(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+        return
+    session = await get_session(int(match["quiz_id"]))
+    if session is None:
+        await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        return
+
+    await send({"type": "websocket.accept"})
+    subscriber = Subscriber(user.id, is_host=user.id == session.owner_id, is_student=user.is_student)
+
+    async def sender():
+        # The only task sending to the socket after the accept
+        while True:
+            text = await subscriber.queue.get()
+            if text is None:
+                await send({"type": "websocket.close", "code": CLOSE_TOO_SLOW})
+                return
+            await send({"type": "websocket.send", "text": text})
+
+    session.subscribers.add(subscriber)
+    sending = asyncio.create_task(sender())
+    session.publish(session.state())
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message["type"] == "websocket.receive" and message.get("text") is not None:
+                reply = await handle_message(session, subscriber, message["text"])
+                if reply:
+                    subscriber.push(json.dumps(reply))
+    finally:
+        session.subscribers.discard(subscriber)
+        sending.cancel()
+        if not session.subscribers:
+            # Nobody left to host or answer, save and grade what was answered
+            await session.end()
+            if sessions.get(session.quiz_id) is session:
+                del sessions[session.quiz_id]
+        else:
+            session.publish(session.state())
@@ -0,0 +1,40 @@
+import io
+import os
+import pstats
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from testskool.profiling import PROFILE_NAME_RE
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Merge the sampled request profiles into a top functions report per endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=None, help="Profile directory, PROFILING_DIR by default")
+        parser.add_argument("--url-name", action="append", help="Only this endpoint, may be repeated")
+        parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "calls"])
+        parser.add_argument("--limit", type=int, default=25, help="Functions per endpoint")
+
+    def handle(self, *args, **options):
+        directory = options["dir"] or settings.PROFILING_DIR
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} does not exist.")
+
+        profiles = defaultdict(list)
+        for name in sorted(os.listdir(directory)):
+            match = PROFILE_NAME_RE.match(name)
+            if match and (not options["url_name"] or match["url_name"] in options["url_name"]):
+                profiles[match["url_name"]].append(os.path.join(directory, name))
+        if not profiles:
+            self.stdout.write("No profiles found.")
+            return
+
+        # Endpoints with the most samples first
+        for url_name, paths in sorted(profiles.items(), key=lambda item: (-len(item[1]), item[0])):
+            report = io.StringIO()
+            stats = pstats.Stats(*paths, stream=report)
+            stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{url_name}: {len(paths)} profile(s)"))
+            self.stdout.write(report.getvalue())
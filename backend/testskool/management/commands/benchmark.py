@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from testskool.benchmark import run_benchmark, compare
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Benchmark the testskool endpoints on a freshly seeded throwaway database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+        parser.add_argument("--endpoint", action="append", dest="endpoints", help="Only this endpoint (repeatable)")
+        parser.add_argument("--teachers", type=int, default=200)
+        parser.add_argument("--students", type=int, default=2000)
+        parser.add_argument("--throttle", action="store_true", help="Keep API throttling enabled")
+        parser.add_argument("--output", help="Save the results as JSON")
+        parser.add_argument("--baseline", help="Compare with results saved by an earlier run")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)["endpoints"]
+
+        # Never touch the real database, benchmark a file based copy of the schema
+        workdir = tempfile.TemporaryDirectory()
+        settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = os.path.join(workdir.name, "bench.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_benchmark(
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+                endpoints=options["endpoints"],
+                teachers=options["teachers"],
+                students=options["students"],
+                throttle=options["throttle"],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            workdir.cleanup()
+
+        self.stdout.write(f"{'endpoint':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}{'RSS MB':>9}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<20}{result['rps']:>9}{result['p50_ms']:>9}{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                f"{result['queries_per_request']:>9}{result['errors']:>8}{result['peak_rss_mb']:>9}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump({"options": {k: options[k] for k in ("requests", "concurrency", "teachers", "students")},
+                           "endpoints": results}, f, indent=2)
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
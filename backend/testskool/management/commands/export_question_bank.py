@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from testskool.models import Question
+from testskool.question_bank import export_question_bank
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Export a teacher's questions as a JSON Lines question bank"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", required=True, help="Username of the teacher owning the quizzes")
+        parser.add_argument("--quiz", type=int, action="append", help="Only this quiz, may be repeated")
+        parser.add_argument("--output", "-o", help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        owner = get_user_model().objects.filter(username=options["owner"], is_teacher=True).first()
+        if owner is None:
+            raise CommandError("Teacher not found.")
+
+        questions = Question.objects.filter(quiz__quiz_owner=owner)
+        if options["quiz"]:
+            questions = questions.filter(quiz_id__in=options["quiz"])
+
+        lines = export_question_bank(questions)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from testskool.grading import grade_quiz
+from testskool.models import Quiz
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Grade the ungraded solutions of a quiz"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id", type=int)
+        parser.add_argument("--batch-size", type=int, help="Solutions graded per transaction")
+
+    def handle(self, *args, **options):
+        if not Quiz.objects.filter(pk=options["quiz_id"]).exists():
+            raise CommandError("Quiz not found.")
+
+        results = grade_quiz(options["quiz_id"], batch_size=options["batch_size"])
+        graded = sum(result["graded"] for result in results.values())
+        self.stdout.write(self.style.SUCCESS(f"Graded {graded} answer(s) of {len(results)} student(s)."))
@@ -0,0 +1,44 @@
+import json
+import sys
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from testskool.question_bank import import_question_bank, read_question_bank
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Import a question bank from a JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Question bank file, '-' reads from stdin")
+        parser.add_argument("--owner", required=True, help="Username of the teacher owning the quizzes")
+        parser.add_argument("--batch-size", type=int, help="Rows validated and inserted at once")
+        parser.add_argument("--report", help="Write the per-row report (JSON Lines) to this file")
+
+    def handle(self, *args, **options):
+        owner = get_user_model().objects.filter(username=options["owner"], is_teacher=True).first()
+        if owner is None:
+            raise CommandError("Teacher not found.")
+
+        path = options["path"]
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig")
+        report = open(options["report"], "w", encoding="utf-8") if options["report"] else None
+        created = failed = 0
+
+        try:
+            rows = read_question_bank(stream)
+            for entry in import_question_bank(owner, rows, batch_size=options["batch_size"]):
+                if entry["status"] == "created":
+                    created += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"Row {entry['row']}: {json.dumps(entry['errors'])}")
+                if report:
+                    report.write(json.dumps(entry) + "\n")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if report:
+                report.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} question(s), {failed} row(s) failed."))
@@ -0,0 +1,44 @@
+import json
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from testskool.roster import ROSTER_FORMATS, detect_format, read_roster, import_roster
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Register a class roster from a CSV or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Roster file, '-' reads from stdin")
+        parser.add_argument("--format", choices=ROSTER_FORMATS, help="Defaults to the file extension")
+        parser.add_argument("--workers", type=int, help="Password hashing processes")
+        parser.add_argument("--batch-size", type=int, help="Rows validated and inserted at once")
+        parser.add_argument("--report", help="Write the per-row report (JSON Lines) to this file")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = detect_format(path, options["format"])
+        if not fmt:
+            raise CommandError("Cannot detect the roster format, use --format.")
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        report = open(options["report"], "w", encoding="utf-8") if options["report"] else None
+        created = failed = 0
+
+        try:
+            rows = read_roster(stream, fmt)
+            for entry in import_roster(rows, workers=options["workers"], batch_size=options["batch_size"]):
+                if entry["status"] == "created":
+                    created += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f"Row {entry['row']}: {json.dumps(entry['errors'])}")
+                if report:
+                    report.write(json.dumps(entry) + "\n")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if report:
+                report.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} account(s), {failed} row(s) failed."))
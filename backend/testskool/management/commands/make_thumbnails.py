@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from testskool.images import make_thumbnails
+from testskool.models import User
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Make missing profile picture thumbnails"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild existing thumbnails too")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True)
+        if not options["all"]:
+            users = users.filter(profile_thumbnails={})
+
+        done = failed = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            if make_thumbnails(user_id):
+                done += 1
+            else:
+                failed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Made thumbnails for {done} user(s), {failed} failed."))
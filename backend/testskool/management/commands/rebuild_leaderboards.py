@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from testskool.leaderboard import rebuild_subject_scores
+from testskool.models import SubjectScore
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Recompute the subject scores of the leaderboards from the quiz results"
+
+    def handle(self, *args, **options):
+        rebuild_subject_scores()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {SubjectScore.objects.count()} subject score(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from testskool.models import Quiz
+from testskool.stats import rebuild_quiz_stats
+
+
+# https://docs.djangoproject.com/en/5.1/howto/custom-management-commands/
+class Command(BaseCommand):
+    help = "Rebuild the statistics of quizzes from their graded solutions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_ids", nargs="*", type=int, help="Quizzes to rebuild, every quiz by default")
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.order_by("id")
+        if options["quiz_ids"]:
+            quizzes = quizzes.filter(id__in=options["quiz_ids"])
+        count = 0
+        for quiz_id in quizzes.values_list("id", flat=True):
+            rebuild_quiz_stats(quiz_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the statistics of {count} quiz(zes)."))
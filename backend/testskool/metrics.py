@@ -0,0 +1,248 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+# Every process adds its observations up in memory and a background thread
+# adds them, every METRICS_FLUSH_INTERVAL seconds, to a small SQLite file shared
+# by the worker processes on the host (like the throttling buckets), so
+# /metrics reports the totals of all of them. Requests (and the ASGI event
+# loop) never wait for the file.
+# https://prometheus.io/docs/instrumenting/exposition_formats/#text-based-format
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HASH_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(8))  # 1 KiB to 16 MiB
+
+
+class MetricsStore:
+    """ SQLite file holding the samples of every process """
+
+    # Bucket samples carry their upper bound in `le`, the other samples ''
+    ADD_SQL = """
+        INSERT INTO metric_sample (name, labels, le, value) VALUES (?, ?, ?, ?)
+        ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        # sqlite3 connections cannot be shared between threads
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS metric_sample ("
+                "name TEXT NOT NULL, labels TEXT NOT NULL, le TEXT NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (name, labels, le)"
+                ") WITHOUT ROWID"
+            )
+            self.local.connection = connection
+        return connection
+
+    def add(self, samples):
+        """ Add {(name, labels, le): value} to the stored totals """
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(self.ADD_SQL, [(*key, value) for key, value in samples.items()])
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def samples(self):
+        return self.connection.execute("SELECT name, labels, le, value FROM metric_sample").fetchall()
+
+    def clear(self):
+        self.connection.execute("DELETE FROM metric_sample")
+
+
+metrics_store = MetricsStore(settings.METRICS_STORE_PATH)
+
+
+@receiver(setting_changed)
+def reset_metrics_store(setting, **kwargs):
+    global metrics_store
+    if setting == "METRICS_STORE_PATH":
+        metrics_store = MetricsStore(settings.METRICS_STORE_PATH)
+
+
+class Registry:
+    """ Metric definitions and the samples of this process not stored yet """
+
+    def __init__(self):
+        self.metrics = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        # A scrape waits for a flush in progress, so it sees all of its samples
+        self.flushing = threading.Lock()
+        self.flusher_pid = None
+        # Set to flush before the interval is over
+        self.wakeup = threading.Event()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def add(self, samples):
+        with self.lock:
+            for key, value in samples:
+                self.pending[key] = self.pending.get(key, 0) + value
+        if self.flusher_pid != os.getpid():
+            self.start_flusher()
+
+    def start_flusher(self):
+        # Started in the process making observations, threads do not survive a fork
+        with self.lock:
+            if self.flusher_pid == os.getpid():
+                return
+            self.flusher_pid = os.getpid()
+        threading.Thread(target=self.flush_periodically, name="metrics-flusher", daemon=True).start()
+        atexit.register(self.flush)
+
+    def flush_periodically(self):
+        while True:
+            self.wakeup.wait(settings.METRICS_FLUSH_INTERVAL)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """ Add the pending samples to the shared store """
+        with self.flushing:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            if not pending:
+                return
+            try:
+                metrics_store.add(pending)
+            except sqlite3.Error:
+                # Keep them for the next flush
+                logger.warning("Cannot store metrics", exc_info=True)
+                with self.lock:
+                    for key, value in pending.items():
+                        self.pending[key] = self.pending.get(key, 0) + value
+
+    def clear(self):
+        with self.flushing, self.lock:
+            self.pending = {}
+            metrics_store.clear()
+
+    def render(self):
+        """ Stored samples of every process in the Prometheus text format """
+        self.flush()
+        samples = {}
+        for name, labels, le, value in metrics_store.samples():
+            samples.setdefault(name, []).append((labels, le, value))
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix in metric.suffixes:
+                rows = samples.get(metric.name + suffix, [])
+                # Buckets of a series in increasing order, +Inf last
+                rows.sort(key=lambda row: (row[0], float(row[1]) if row[1] else 0))
+                for labels, le, value in rows:
+                    if le:
+                        labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                    lines.append(f"{metric.name}{suffix}{{{labels}}} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    suffixes = ("",)
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        registry.register(self)
+
+    def labels(self, values):
+        return ",".join(f'{name}="{escape(values[name])}"' for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        registry.add([((self.name, self.labels(labels), ""), amount)])
+
+
+class Histogram(Metric):
+    type = "histogram"
+    suffixes = ("_bucket", "_sum", "_count")
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = [*(format_value(float(bound)) for bound in buckets), "+Inf"]
+        self.bounds = [*buckets, float("inf")]
+
+    def observe(self, value, **labels):
+        labels = self.labels(labels)
+        # Cumulative buckets, every one of them is written so that none is missing
+        samples = [
+            ((f"{self.name}_bucket", labels, le), 1 if value <= bound else 0)
+            for le, bound in zip(self.buckets, self.bounds)
+        ]
+        samples.append(((f"{self.name}_sum", labels, ""), value))
+        samples.append(((f"{self.name}_count", labels, ""), 1))
+        registry.add(samples)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+request_duration = Histogram(
+    "testskool_http_request_duration_seconds", "Request latency.", ("url_name", "method", "status"),
+)
+db_queries = Counter("testskool_db_queries_total", "Database queries.", ("url_name",))
+db_query_duration = Counter("testskool_db_query_duration_seconds_total", "Time spent in database queries.", ("url_name",))
+cache_requests = Counter("testskool_cache_requests_total", "Cache lookups by result (hit / miss).", ("result",))
+throttled_requests = Counter("testskool_throttled_requests_total", "Requests rejected by the throttles.", ("scope",))
+password_hash_duration = Histogram(
+    "testskool_password_hash_duration_seconds", "Password hashing time.", ("operation",), buckets=HASH_BUCKETS,
+)
+upload_size = Histogram("testskool_upload_size_bytes", "Size of uploaded files.", ("view", "field"), buckets=SIZE_BUCKETS)
+
+
+@require_safe
+def metrics_view(request):
+    """ Prometheus scrape endpoint, METRICS_ALLOWED_IPS only """
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        raise Http404()
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+def merge_teacher_links(apps, schema_editor):
+    """ Copy Subject.teachers rows missing from User.subject into it """
+    Subject = apps.get_model('testskool', 'Subject')
+    User = apps.get_model('testskool', 'User')
+    TeacherLink = Subject.teachers.through
+    UserSubject = User.subject.through
+
+    links = [
+        UserSubject(user_id=user_id, subject_id=subject_id)
+        for subject_id, user_id in TeacherLink.objects.values_list('subject_id', 'user_id').iterator()
+    ]
+    UserSubject.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0006_alter_user_email'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_teacher_links, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='subject',
+            name='teachers',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='subject',
+            field=models.ManyToManyField(blank=True, related_name='teachers', to='testskool.subject'),
+        ),
+    ]
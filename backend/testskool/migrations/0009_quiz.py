@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0008_user_profile_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Quiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=32)),
+                ('title', models.CharField(max_length=256)),
+                ('cover_image', models.ImageField(blank=True, null=True, upload_to='quiz-covers')),
+                ('about', models.CharField(blank=True, max_length=2048)),
+                ('date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quiz_owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='quizzes', to='testskool.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject', 'date'], name='quiz_subject_date_idx'), models.Index(fields=['quiz_owner', 'date'], name='quiz_owner_date_idx'), models.Index(fields=['date'], name='quiz_date_idx')],
+            },
+        ),
+    ]
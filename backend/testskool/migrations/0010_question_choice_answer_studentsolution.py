@@ -0,0 +1,56 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0009_quiz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.TextField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='testskool.quiz')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Choice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('choice', models.CharField(max_length=8)),
+                ('text', models.TextField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='choices', to='testskool.question')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Answer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='testskool.choice')),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='answer', to='testskool.question')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentSolution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_correct', models.BooleanField(blank=True, null=True)),
+                ('date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('solved_question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solutions', to='testskool.question')),
+                ('solved_quiz', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='solutions', to='testskool.quiz')),
+                ('student', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='solutions', to=settings.AUTH_USER_MODEL)),
+                ('student_answer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='testskool.choice')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['solved_quiz', 'is_correct'], name='solution_quiz_graded_idx'), models.Index(fields=['student', 'solved_quiz'], name='solution_student_quiz_idx')],
+            },
+        ),
+    ]
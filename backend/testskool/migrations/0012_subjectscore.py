@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0011_quizresult_quizstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('updated', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_scores', to=settings.AUTH_USER_MODEL)),
+                ('subject', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='testskool.subject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subject', 'student'), name='subject_score_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:05
+
+from django.db import migrations
+
+
+# Frozen copy of testskool.search.REBUILD_SQL
+FILL_INDEX = [
+    """INSERT INTO testskool_search (rowid, kind, title, body, private)
+        SELECT id * 8 + 1, 'subject', name, '', '' FROM testskool_subject""",
+    """INSERT INTO testskool_search (rowid, kind, title, body, private)
+        SELECT id * 8 + 2, CASE WHEN is_teacher THEN 'teacher' ELSE 'student' END,
+               coalesce(nullif(trim(first_name || ' ' || last_name), ''), username), about,
+               username || ' ' || email
+        FROM testskool_user""",
+    """INSERT INTO testskool_search (rowid, kind, title, body, private)
+        SELECT id * 8 + 3, 'quiz', title, about, '' FROM testskool_quiz""",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0012_subjectscore'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """CREATE VIRTUAL TABLE testskool_search USING fts5(
+                kind UNINDEXED, title, body, private,
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )""",
+            "DROP TABLE testskool_search",
+        ),
+        migrations.RunSQL(FILL_INDEX, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('testskool', '0013_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_teacher', 'last_name', 'first_name', 'id'], name='user_teacher_name_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:05
+
+import time
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testskool', '0014_user_teacher_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='version',
+            field=models.BigIntegerField(default=time.time_ns, editable=False),
+        ),
+    ]
@@ -1,23 +1,185 @@
+import time
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+from .metrics import password_hash_duration
 
 # Create your models here.
 
 # Model for users
 class User(AbstractUser):
     about = models.CharField(max_length=2048, blank=True)
-    subject = models.ManyToManyField("Subject", blank=True, related_name="teachers_set")
+    # Single teacher - subject relation, Subject.teachers is its reverse side
+    subject = models.ManyToManyField("Subject", blank=True, related_name="teachers")
     is_teacher = models.BooleanField(default=False)
     is_student = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to="profile-pictures", blank=True, null=True)
+    # {"<size>": {"webp": name, "jpeg": name}}, filled in by images.make_thumbnails
+    profile_thumbnails = models.JSONField(default=dict, blank=True)
+
+    class Meta(AbstractUser.Meta):
+        # Teacher directory order (views.TeacherListView)
+        indexes = [
+            models.Index(fields=["is_teacher", "last_name", "first_name", "id"], name="user_teacher_name_idx"),
+        ]
 
     def __str__(self):
         return self.username
 
+    # Hashing time is reported on /metrics (testskool.metrics)
+    def set_password(self, raw_password):
+        with password_hash_duration.time(operation="set"):
+            super().set_password(raw_password)
+
+    def check_password(self, raw_password):
+        with password_hash_duration.time(operation="check"):
+            return super().check_password(raw_password)
+
+    # Compatibility accessor for the former Subject.teachers relation
+    @property
+    def subjects_set(self):
+        return self.subject
+
 # Model for subjects
 class Subject(models.Model):
     name = models.CharField(max_length=64)
-    teachers = models.ManyToManyField(User, related_name="subjects_set", blank=True)
 
     def __str__(self):
         return f"Subject: {self.name}"
+
+# Model for quizzes
+class Quiz(models.Model):
+    # Single column FK indexes are left out, the composite indexes below cover them
+    quiz_owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="quizzes", db_index=False)
+    type = models.CharField(max_length=32)
+    title = models.CharField(max_length=256)
+    cover_image = models.ImageField(upload_to="quiz-covers", blank=True, null=True)
+    subject = models.ForeignKey(Subject, on_delete=models.PROTECT, related_name="quizzes", db_index=False)
+    about = models.CharField(max_length=2048, blank=True)
+    date = models.DateTimeField(default=timezone.now)
+    # Version of the students' quiz payload (quiz_payload.py), a nanosecond timestamp
+    # changed along with the quiz, its questions or choices
+    version = models.BigIntegerField(default=time.time_ns, editable=False)
+
+    class Meta:
+        # Catalog browsing is newest first, by subject, by owner or over everything
+        # https://docs.djangoproject.com/en/5.1/ref/models/indexes/
+        indexes = [
+            models.Index(fields=["subject", "date"], name="quiz_subject_date_idx"),
+            models.Index(fields=["quiz_owner", "date"], name="quiz_owner_date_idx"),
+            models.Index(fields=["date"], name="quiz_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"Quiz: {self.title}"
+
+# Model for quiz questions
+class Question(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
+    question = models.TextField()
+
+    def __str__(self):
+        return f"Question: {self.question[:50]}"
+
+# Model for question choices (A, B, C, ...)
+class Choice(models.Model):
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="choices")
+    choice = models.CharField(max_length=8)
+    text = models.TextField()
+
+    def __str__(self):
+        return f"Choice: {self.choice}) {self.text[:50]}"
+
+# Model for the correct choice of a question
+class Answer(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name="answer")
+    answer = models.ForeignKey(Choice, on_delete=models.CASCADE, related_name="+")
+
+    def __str__(self):
+        return f"Answer: {self.answer_id}"
+
+# Model for a student's answer to one question of a quiz
+class StudentSolution(models.Model):
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="solutions", db_index=False)
+    solved_quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="solutions", db_index=False)
+    solved_question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="solutions")
+    # Empty when the question was left unanswered
+    student_answer = models.ForeignKey(Choice, on_delete=models.SET_NULL, related_name="+", blank=True, null=True)
+    # Empty until graded
+    is_correct = models.BooleanField(blank=True, null=True)
+    date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Ungraded rows of a quiz (grading.py)
+            models.Index(fields=["solved_quiz", "is_correct"], name="solution_quiz_graded_idx"),
+            # A student's solutions
+            models.Index(fields=["student", "solved_quiz"], name="solution_student_quiz_idx"),
+        ]
+
+    def __str__(self):
+        return f"Solution: {self.student_id} / {self.solved_question_id}"
+
+# Model for a student's running result of a quiz, maintained by stats.py
+class QuizResult(models.Model):
+    # The unique constraint below covers the quiz lookups
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="results", db_index=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="quiz_results")
+    correct = models.PositiveIntegerField(default=0)
+    answered = models.PositiveIntegerField(default=0)
+    graded = models.PositiveIntegerField(default=0)
+    date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["quiz", "student"], name="quiz_result_unique"),
+        ]
+
+    def __str__(self):
+        return f"Result: {self.student_id} / {self.quiz_id}"
+
+# Model for the materialized statistics of a quiz, maintained by stats.py
+class QuizStats(models.Model):
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    # Number of questions the histogram and completion counts are based on
+    question_count = models.PositiveIntegerField(default=0)
+    students = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    answered = models.PositiveIntegerField(default=0)
+    graded = models.PositiveIntegerField(default=0)
+    # Students per score bucket, lowest first
+    histogram = models.JSONField(default=list)
+    # {question_id: {"correct": n, "answered": n, "graded": n}}
+    questions = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats: {self.quiz_id}"
+
+# Model for a student's total score in a subject, maintained by leaderboard.py
+class SubjectScore(models.Model):
+    # The unique constraint below covers the subject lookups
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="scores", db_index=False)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="subject_scores")
+    score = models.PositiveIntegerField(default=0)
+    # Other processes sync their in-memory leaderboards from recently updated rows
+    updated = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["subject", "student"], name="subject_score_unique"),
+        ]
+
+    def __str__(self):
+        return f"Score: {self.student_id} / {self.subject_id}"
+
+# Model for the version of data every worker process keeps its own copy of
+# (catalog.py), caches may be per process, this table is what they all read
+class CacheVersion(models.Model):
+    name = models.CharField(max_length=64, primary_key=True)
+    # Nanosecond timestamp of the last change
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"Version: {self.name} {self.version}"
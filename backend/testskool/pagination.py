@@ -0,0 +1,128 @@
+import json
+import operator
+from datetime import date, datetime
+from functools import reduce
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+# Keyset (cursor) pagination, the page position is the last row's sort key
+# instead of an OFFSET, so every page costs the same index range scan.
+# https://www.django-rest-framework.org/api-guide/pagination/#cursorpagination
+#
+# DRF's CursorPagination keys the cursor on the first ordering field only and
+# steps over rows sharing that value with an offset, capped at offset_cutoff.
+# Here the cursor holds the whole sort key, which ends with a unique column,
+# so any number of ties (e.g. teachers without a name) pages correctly.
+class KeysetCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is not None:
+            self.cursor = self.cursor._replace(position=self.clean_position(queryset.model, self.cursor.position))
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = [_invert(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(_after(ordering, self.cursor.position))
+
+        # One extra row tells whether there is a page beyond this one
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.position(self.page[0])))
+
+    def position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            values.append(value.isoformat() if isinstance(value, date) else value)
+        return json.dumps(values)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            position = json.loads(cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Column values only, no objects or lists
+        if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def clean_position(self, model, values):
+        """ Cursor values converted to the types of their ordering fields """
+        position = []
+        try:
+            for name, value in zip(self.ordering, values):
+                field = model._meta.get_field(name.lstrip("-"))
+                value = field.to_python(value)
+                # Range of integer columns, length of text ones
+                field.run_validators(value)
+                position.append(value)
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Datetimes are written with their offset
+        for value in position:
+            if isinstance(value, datetime) and timezone.is_naive(value):
+                raise NotFound(self.invalid_cursor_message)
+        return position
+
+
+def _invert(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _after(ordering, values):
+    """ Rows sorting after `values` in `ordering`: (a > x) OR (a = x AND b > y) OR ... """
+    conditions = []
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        conditions.append(equal & Q(**{f"{name}__{lookup}": value}))
+        equal &= Q(**{name: value})
+    return reduce(operator.or_, conditions)
+
+
+class QuizCursorPagination(KeysetCursorPagination):
+    ordering = ("-date", "-id")
+
+
+
+# Teachers by name, ties broken by id so every teacher has a stable position
+class TeacherCursorPagination(KeysetCursorPagination):
+    ordering = ("last_name", "first_name", "id")
@@ -0,0 +1,10 @@
+from rest_framework.permissions import IsAuthenticated
+
+
+# https://www.django-rest-framework.org/api-guide/permissions/#custom-permissions
+class IsTeacher(IsAuthenticated):
+    """ Allow teachers only """
+    message = "Only teachers can do this."
+
+    def has_permission(self, request, view):
+        return super().has_permission(request, view) and request.user.is_teacher
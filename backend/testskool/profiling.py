@@ -0,0 +1,111 @@
+import cProfile
+import itertools
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+
+# Sampling profiler
+# Opt-in (PROFILING_SAMPLE_RATE): one in N requests of every URL name runs under
+# cProfile and its stats are written to PROFILING_DIR as
+#   <url name>.<time ns>.<pid>.prof
+# keeping the newest PROFILING_MAX_FILES files. The aggregate_profiles command
+# merges them into a report per endpoint.
+# https://docs.python.org/3/library/profile.html
+PROFILE_NAME_RE = re.compile(r"^(?P<url_name>.+)\.\d+\.\d+\.prof$")
+
+
+def profile_filename(url_name):
+    name = re.sub(r"[^\w-]", "-", url_name or "unresolved")
+    return f"{name}.{time.time_ns()}.{os.getpid()}.prof"
+
+
+def rotate(directory, keep):
+    """ Delete the oldest profiles beyond `keep` """
+    entries = [entry for entry in os.scandir(directory) if PROFILE_NAME_RE.match(entry.name)]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:len(entries) - keep]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            # Removed by another worker
+            pass
+
+
+class SamplingProfilerMiddleware:
+    """ Profile one in PROFILING_SAMPLE_RATE requests of each URL name """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE:
+            # Dropped from the middleware chain, no cost when disabled
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.rate = settings.PROFILING_SAMPLE_RATE
+        self.directory = settings.PROFILING_DIR
+        self.counters = defaultdict(itertools.count)
+        self.lock = threading.Lock()
+        # cProfile hooks a thread, one profile at a time per thread
+        self.local = threading.local()
+        os.makedirs(self.directory, exist_ok=True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self, request):
+        """ URL name of the request if it is to be profiled, else False """
+        if getattr(self.local, "profiling", False):
+            return False
+        try:
+            url_name = resolve(request.path_info).view_name
+        except Resolver404:
+            url_name = None
+        with self.lock:
+            if next(self.counters[url_name]) % self.rate:
+                return False
+        return url_name or "unresolved"
+
+    def save(self, profiler, url_name):
+        profiler.dump_stats(os.path.join(self.directory, profile_filename(url_name)))
+        rotate(self.directory, settings.PROFILING_MAX_FILES)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        url_name = self.sampled(request)
+        if not url_name:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        self.local.profiling = True
+        try:
+            return profiler.runcall(self.get_response, request)
+        finally:
+            self.local.profiling = False
+            self.save(profiler, url_name)
+
+    async def __acall__(self, request):
+        url_name = self.sampled(request)
+        if not url_name:
+            return await self.get_response(request)
+
+        # Profiles the event loop thread while the request is awaited: other
+        # requests' coroutines running meanwhile are included, the threads of
+        # sync_to_async are not
+        profiler = cProfile.Profile()
+        self.local.profiling = True
+        profiler.enable()
+        try:
+            return await self.get_response(request)
+        finally:
+            profiler.disable()
+            self.local.profiling = False
+            await sync_to_async(self.save)(profiler, url_name)
@@ -0,0 +1,176 @@
+import json
+from itertools import islice
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from .models import Answer, Choice, Question, Quiz, Subject
+from .quiz_payload import invalidate_quiz_payloads
+from .search import index_quizzes
+from .roster import read_roster
+
+
+# Question bank import / export
+# A question bank is a JSON Lines file, one question per line:
+#   {"quiz": "Fractions", "subject": "Math", "type": "test", "question": "1/2 + 1/4 = ?",
+#    "choices": {"A": "3/4", "B": "2/6"}, "answer": "A"}
+# choices may also be a list of {"choice": "A", "text": "3/4"} objects.
+# Questions go into the importing teacher's quiz with that title and subject,
+# which is created when missing. Both directions stream, a bank of any size is
+# handled in constant memory (apart from one id per quiz).
+
+
+def _parse_choices(value):
+    if isinstance(value, dict):
+        return [(str(letter).strip(), text) for letter, text in value.items()]
+    if isinstance(value, list):
+        return [
+            (str(item.get("choice") or "").strip(), item.get("text")) if isinstance(item, dict) else ("", None)
+            for item in value
+        ]
+    return []
+
+
+def validate_question(row, subjects):
+    """ Return (cleaned data, errors) for one question bank row """
+    errors = {}
+    quiz = str(row.get("quiz") or "").strip()
+    subject = str(row.get("subject") or "").strip()
+    quiz_type = str(row.get("type") or "").strip()
+    question = str(row.get("question") or "").strip()
+    choices = _parse_choices(row.get("choices"))
+    answer = str(row.get("answer") or "").strip()
+
+    if not quiz:
+        errors["quiz"] = ["This field is required."]
+    elif len(quiz) > 256:
+        errors["quiz"] = ["Ensure this field has no more than 256 characters."]
+
+    if not subject:
+        errors["subject"] = ["This field is required."]
+    elif subject not in subjects:
+        errors["subject"] = [f'Subject "{subject}" does not exist.']
+
+    if not quiz_type:
+        errors["type"] = ["This field is required."]
+    elif len(quiz_type) > 32:
+        errors["type"] = ["Ensure this field has no more than 32 characters."]
+
+    if not question:
+        errors["question"] = ["This field is required."]
+
+    letters = [letter for letter, _ in choices]
+    if len(choices) < 2:
+        errors["choices"] = ["A question needs at least two choices."]
+    elif any(not letter or len(letter) > 8 or not isinstance(text, str) or not text.strip() for letter, text in choices):
+        errors["choices"] = ["Every choice needs a letter (up to 8 characters) and a text."]
+    elif len(set(letters)) != len(letters):
+        errors["choices"] = ["Choice letters must be unique."]
+    elif answer not in letters:
+        errors["answer"] = ["The answer must be one of the choices."]
+
+    if errors:
+        return None, errors
+
+    return {
+        "quiz": quiz,
+        "subject_id": subjects[subject],
+        "type": quiz_type,
+        "question": question,
+        "choices": [(letter, text.strip()) for letter, text in choices],
+        "answer": answer,
+    }, None
+
+
+def _insert_batch(owner, cleaned, quizzes):
+    """ Create missing quizzes, then questions, choices and answers with one bulk INSERT each """
+    with transaction.atomic():
+        missing = {(data["quiz"], data["subject_id"]): data["type"] for data in cleaned}
+        missing = {key: quiz_type for key, quiz_type in missing.items() if key not in quizzes}
+        if missing:
+            existing = Quiz.objects.filter(
+                quiz_owner=owner, title__in={title for title, _ in missing}
+            ).order_by("id").values_list("title", "subject_id", "id")
+            for title, subject_id, quiz_id in existing:
+                quizzes.setdefault((title, subject_id), quiz_id)
+            new = [
+                Quiz(quiz_owner=owner, title=title, subject_id=subject_id, type=quiz_type)
+                for (title, subject_id), quiz_type in missing.items()
+                if (title, subject_id) not in quizzes
+            ]
+            for quiz in Quiz.objects.bulk_create(new):
+                quizzes[(quiz.title, quiz.subject_id)] = quiz.id
+            # bulk_create() sends no signals
+            index_quizzes(new)
+
+        questions = Question.objects.bulk_create([
+            Question(quiz_id=quizzes[(data["quiz"], data["subject_id"])], question=data["question"])
+            for data in cleaned
+        ])
+        choices = Choice.objects.bulk_create([
+            Choice(question_id=question.id, choice=letter, text=text)
+            for question, data in zip(questions, cleaned)
+            for letter, text in data["choices"]
+        ])
+        by_letter = {(choice.question_id, choice.choice): choice.id for choice in choices}
+        Answer.objects.bulk_create([
+            Answer(question_id=question.id, answer_id=by_letter[(question.id, data["answer"])])
+            for question, data in zip(questions, cleaned)
+        ])
+
+        # bulk_create() sends no signals
+        invalidate_quiz_payloads(Quiz.objects.filter(pk__in={question.quiz_id for question in questions}))
+
+    return questions
+
+
+def import_question_bank(owner, rows, batch_size=None):
+    """
+    Validate and insert question bank rows in batches.
+    Yields one report entry per row: {"row", "status", ["id" | "errors"]}
+    """
+    batch_size = batch_size or settings.QUESTION_BANK_BATCH_SIZE
+    subjects = dict(Subject.objects.values_list("name", "id"))
+    quizzes = {}
+    rows = enumerate(rows, start=1)
+
+    while batch := list(islice(rows, batch_size)):
+        report, cleaned = [], []
+        for number, row in batch:
+            data, errors = validate_question(row, subjects)
+            if errors:
+                report.append({"row": number, "status": "error", "errors": errors})
+                continue
+            cleaned.append(data)
+            report.append({"row": number, "status": "created"})
+
+        if cleaned:
+            ids = iter(question.id for question in _insert_batch(owner, cleaned, quizzes))
+            for entry in report:
+                if entry["status"] == "created":
+                    entry["id"] = next(ids)
+
+        yield from report
+
+
+def read_question_bank(stream):
+    """ Yield question bank rows from a JSON Lines text stream """
+    return read_roster(stream, "jsonl")
+
+
+def export_question_bank(questions, chunk_size=None):
+    """ Yield one JSON line per question of a Question queryset """
+    questions = questions.select_related("quiz__subject", "answer__answer").prefetch_related(
+        Prefetch("choices", queryset=Choice.objects.order_by("choice", "id"))
+    ).order_by("quiz_id", "id")
+
+    for question in questions.iterator(chunk_size=chunk_size or settings.QUESTION_BANK_BATCH_SIZE):
+        answer = getattr(question, "answer", None)
+        row = {
+            "quiz": question.quiz.title,
+            "subject": question.quiz.subject.name,
+            "type": question.quiz.type,
+            "question": question.question,
+            "choices": {choice.choice: choice.text for choice in question.choices.all()},
+            "answer": answer.answer.choice if answer else None,
+        }
+        yield json.dumps(row, ensure_ascii=False) + "\n"
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import time
+from datetime import datetime, timezone
+from django.core.cache import cache
+from django.db.models import Prefetch
+from .models import Choice, Question, Quiz
+from .renderers import FastJSONRenderer
+from .serializers import QuizDetailSerializer
+
+
+# Quiz payload caching
+# Every student taking a quiz gets the same quiz / question / choice tree, so it
+# is rendered once per quiz version and kept in the cache as JSON and gzip.
+# The version is a column of the quiz row, changed in the same transaction as
+# the quiz, its questions or choices (signals.py), so every worker process
+# sees it even with a per-process cache. Serving a cached payload costs a
+# primary key lookup.
+# When a quiz opens and the payload is missing, one request renders it while
+# the others wait for it instead of all querying and rendering the same tree.
+# https://docs.djangoproject.com/en/5.1/topics/cache/#the-low-level-cache-api
+QUIZ_PAYLOAD_KEY = "quiz-payload:{quiz_id}:{version}"
+QUIZ_LOCK_KEY = "quiz-payload-lock:{quiz_id}:{version}"
+QUIZ_PAYLOAD_TIMEOUT = 60 * 60 * 24
+# Seconds a request waits for the payload another request is rendering
+QUIZ_LOCK_TIMEOUT = 10
+QUIZ_LOCK_POLL = 0.05
+
+
+def get_quiz_version(quiz_id):
+    """ Return the current payload version of a quiz, None if it does not exist """
+    return Quiz.objects.filter(pk=quiz_id).values_list("version", flat=True).first()
+
+
+def invalidate_quiz_payloads(quizzes):
+    """ Give the quizzes of a queryset a new payload version """
+    quizzes.update(version=time.time_ns())
+
+
+def build_quiz_payload(quiz_id, version):
+    """ Render a quiz, None if it does not exist """
+    quiz = Quiz.objects.filter(pk=quiz_id).prefetch_related(
+        Prefetch(
+            "questions",
+            queryset=Question.objects.order_by("id").prefetch_related(
+                Prefetch("choices", queryset=Choice.objects.order_by("choice", "id"))
+            ),
+        )
+    ).first()
+    if quiz is None:
+        return None
+
+    data = QuizDetailSerializer(quiz).data
+    body = FastJSONRenderer().render(data)
+    return {
+        "data": data,
+        "body": body,
+        # mtime=0 keeps the compressed bytes identical for identical bodies
+        "gzip": gzip.compress(body, mtime=0),
+        "etag": hashlib.sha256(body).hexdigest(),
+        "last_modified": datetime.fromtimestamp(version / 1e9, tz=timezone.utc),
+    }
+
+
+def get_quiz_payload(quiz_id):
+    """ Return the rendered quiz (data, body, gzip, etag, last_modified), None if it does not exist """
+    version = get_quiz_version(quiz_id)
+    if version is None:
+        return None
+    key = QUIZ_PAYLOAD_KEY.format(quiz_id=quiz_id, version=version)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lock = QUIZ_LOCK_KEY.format(quiz_id=quiz_id, version=version)
+    if not cache.add(lock, True, QUIZ_LOCK_TIMEOUT):
+        deadline = time.monotonic() + QUIZ_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(QUIZ_LOCK_POLL)
+            payload = cache.get(key)
+            if payload is not None:
+                return payload
+            if cache.get(lock) is None:
+                # The other request failed or gave up, render it here
+                break
+
+    try:
+        payload = build_quiz_payload(quiz_id, version)
+        # None when the quiz was deleted in the meantime
+        if payload is not None:
+            cache.set(key, payload, QUIZ_PAYLOAD_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return payload
@@ -0,0 +1,62 @@
+from django.conf import settings
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Optional, the stdlib encoder is used without it
+    orjson = None
+
+
+# JSON renderer and parser on orjson
+# orjson encodes dicts, lists, strings, numbers and datetimes natively in one
+# call, with the same compact UTF-8 output as DRF's renderer (UTC datetimes
+# end in "Z" like DRF's encoder). Anything else goes through DRF's encoder
+# (Decimal, lazy translations, querysets ...). Without orjson, indented output
+# or values orjson cannot encode, DRF's own implementation is used.
+# https://github.com/ijl/orjson#option
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """ JSONRenderer using orjson when it is installed """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, default=encoders.JSONEncoder().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, circular references ...
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(parsers.JSONParser):
+    """ JSONParser using orjson when it is installed """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # Rejects NaN and Infinity like DRF's strict parser
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+# File downloads (grade book, question bank) answer with their own format
+# whatever the client accepts, e.g. "Accept: text/csv" would otherwise get a 406
+# from the JSON renderers. Errors are rendered by the first renderer (JSON).
+# https://www.django-rest-framework.org/api-guide/content-negotiation/#example
+class DownloadContentNegotiation(BaseContentNegotiation):
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
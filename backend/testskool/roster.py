@@ -0,0 +1,252 @@
+import csv
+import io
+import json
+import multiprocessing
+import threading
+import time
+import django
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator
+from django.db import transaction
+from .metrics import password_hash_duration
+from .models import Subject
+from .search import index_users
+
+
+# Bulk (class roster) registration
+# A roster is a CSV file with a header row or a JSON Lines file, one account per row:
+#   username,password,is_teacher,subject,first_name,last_name,email
+# CSV subjects are separated by ";", JSON Lines subjects may also be a list.
+
+ROSTER_FORMATS = ("csv", "jsonl")
+TRUE_VALUES = {"1", "true", "yes", "y", "teacher"}
+FALSE_VALUES = {"", "0", "false", "no", "n", "student"}
+
+
+def detect_format(filename, fmt=None):
+    """ Pick the roster format from an explicit value or the file extension """
+    if fmt:
+        return fmt.lower() if fmt.lower() in ROSTER_FORMATS else None
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def read_roster(stream, fmt):
+    """ Yield roster rows from a text stream without loading the whole file """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+        return
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        # Rows which are not JSON objects are reported as invalid
+        yield row if isinstance(row, dict) else {}
+
+
+def open_upload(upload):
+    """ Wrap an uploaded file as a text stream """
+    return io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value if value is not None else "").strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+def _parse_subjects(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+def validate_row(row, subjects, seen):
+    """ Return (cleaned data, errors) for one roster row, same rules as Register """
+    errors = {}
+    username = str(row.get("username") or "").strip()
+    password = str(row.get("password") or "")
+    confirm = row.get("confirm")
+    is_teacher = _parse_bool(row.get("is_teacher"))
+    subject_names = _parse_subjects(row.get("subject"))
+    email = str(row.get("email") or "").strip()
+
+    if not username:
+        errors["username"] = ["This field is required."]
+    elif len(username) > 150:
+        errors["username"] = ["Ensure this field has no more than 150 characters."]
+    else:
+        try:
+            UnicodeUsernameValidator()(username)
+        except ValidationError as e:
+            errors["username"] = list(e.messages)
+        else:
+            if username in seen:
+                errors["username"] = ["A user with that username already exists."]
+
+    if len(password) < 8:
+        errors["password"] = ["Password must be at least 8 characters."]
+    elif confirm is not None and confirm != password:
+        errors["confirm"] = ["Password and confirmation must match."]
+
+    if len(email) > 254:
+        errors["email"] = ["Ensure this field has no more than 254 characters."]
+    elif email:
+        try:
+            EmailValidator()(email)
+        except ValidationError as e:
+            errors["email"] = list(e.messages)
+
+    if is_teacher is None:
+        errors["is_teacher"] = ["Choose one field: student or teacher."]
+    elif is_teacher:
+        subject_ids = [subjects[name] for name in subject_names if name in subjects]
+        if not subject_ids:
+            errors["subject"] = ["Please select your subject(s)."]
+    elif subject_names:
+        errors["subject"] = ["Only teachers can choose a subject."]
+
+    if errors:
+        return None, errors
+
+    return {
+        "username": username,
+        "password": password,
+        "is_teacher": is_teacher,
+        "subject_ids": subject_ids if is_teacher else [],
+        "first_name": str(row.get("first_name") or "")[:150],
+        "last_name": str(row.get("last_name") or "")[:150],
+        "email": email,
+    }, None
+
+
+# worker count -> pool, shared by every import of this process
+_hash_pools = {}
+_hash_pools_lock = threading.Lock()
+
+
+def hash_pool(workers):
+    """ Password hashing processes, started on first use and kept for the next imports """
+    with _hash_pools_lock:
+        pool = _hash_pools.get(workers)
+        if pool is None:
+            # Spawned, a fork would copy the whole (threaded) web worker. Spawned
+            # workers configure Django before hashing, this module (and the
+            # models it imports) cannot be loaded before that.
+            pool = _hash_pools[workers] = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup,
+            )
+        return pool
+
+
+def timed_make_password(password):
+    """ (hash, seconds), observed by the importing process, samples of pool workers would be lost """
+    start = time.perf_counter()
+    hashed = make_password(password)
+    return hashed, time.perf_counter() - start
+
+
+def _insert_batch(cleaned, hashes):
+    """ Create users and their subject links with two bulk INSERTs """
+    User = get_user_model()
+    users = [
+        User(
+            username=data["username"],
+            password=password,
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            email=data["email"],
+            is_teacher=data["is_teacher"],
+            is_student=not data["is_teacher"],
+        )
+        for data, password in zip(cleaned, hashes)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=settings.ROSTER_BATCH_SIZE)
+        ids = dict(
+            User.objects.filter(username__in=[user.username for user in users]).values_list("username", "id")
+        )
+        links = [
+            User.subject.through(user_id=ids[data["username"]], subject_id=subject_id)
+            for data in cleaned
+            for subject_id in data["subject_ids"]
+        ]
+        User.subject.through.objects.bulk_create(links, batch_size=settings.ROSTER_BATCH_SIZE)
+
+        # bulk_create() sends no signals
+        for user in users:
+            user.pk = ids[user.username]
+        index_users(users)
+
+    return ids
+
+
+def import_roster(rows, workers=None, batch_size=None):
+    """
+    Validate, hash and insert roster rows in batches.
+    Yields one report entry per row: {"row", "username", "status", ["id" | "errors"]}
+    """
+    workers = settings.ROSTER_HASH_WORKERS if workers is None else workers
+    batch_size = batch_size or settings.ROSTER_BATCH_SIZE
+    subjects = dict(Subject.objects.values_list("name", "id"))
+    seen = set()
+    rows = enumerate(rows, start=1)
+
+    pool = hash_pool(workers) if workers > 1 else None
+    while batch := list(islice(rows, batch_size)):
+        # Usernames already taken in the database, one query per batch
+        names = [str(row.get("username") or "").strip() for _, row in batch]
+        seen.update(
+            get_user_model().objects.filter(username__in=names).values_list("username", flat=True)
+        )
+
+        report, cleaned = [], []
+        for number, row in batch:
+            data, errors = validate_row(row, subjects, seen)
+            if errors:
+                report.append({"row": number, "username": row.get("username"), "status": "error", "errors": errors})
+                continue
+            seen.add(data["username"])
+            cleaned.append(data)
+            report.append({"row": number, "username": data["username"], "status": "created"})
+
+        if cleaned:
+            passwords = [data["password"] for data in cleaned]
+            if pool:
+                timed = pool.map(timed_make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4)))
+            else:
+                timed = map(timed_make_password, passwords)
+            hashes = []
+            for hashed, seconds in timed:
+                password_hash_duration.observe(seconds, operation="set")
+                hashes.append(hashed)
+            ids = _insert_batch(cleaned, hashes)
+            for entry in report:
+                if entry["status"] == "created":
+                    entry["id"] = ids[entry["username"]]
+
+        yield from report
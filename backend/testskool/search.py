@@ -0,0 +1,127 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+
+# Full-text search index
+# One SQLite FTS5 table holds subjects, users and quizzes, with the rowid
+# encoding the object: id * 8 + kind code. Rows are written by the signal
+# receivers in signals.py (and the bulk imports), in the same transaction as
+# the objects themselves. The private column (usernames, emails) is only
+# searched from the admin, public searches match title and body only.
+# https://www.sqlite.org/fts5.html
+SEARCH_TABLE = "testskool_search"
+KIND_CODES = {"subject": 1, "user": 2, "quiz": 3}
+PUBLIC_KINDS = ("subject", "teacher", "quiz")
+TOKEN_RE = re.compile(r"\w+")
+MAX_TOKENS = 8
+
+# Migration 0013 fills the index of existing databases with a copy of these
+REBUILD_SQL = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, kind, title, body, private)
+        SELECT id * 8 + 1, 'subject', name, '', '' FROM testskool_subject""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, kind, title, body, private)
+        SELECT id * 8 + 2, CASE WHEN is_teacher THEN 'teacher' ELSE 'student' END,
+               coalesce(nullif(trim(first_name || ' ' || last_name), ''), username), about,
+               username || ' ' || email
+        FROM testskool_user""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, kind, title, body, private)
+        SELECT id * 8 + 3, 'quiz', title, about, '' FROM testskool_quiz""",
+]
+
+
+def _rowid(kind, object_id):
+    return object_id * 8 + KIND_CODES[kind]
+
+
+def _write(rows):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, kind, title, body, private) VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def index_subjects(subjects):
+    _write([(_rowid("subject", subject.pk), "subject", subject.name, "", "") for subject in subjects])
+
+
+def index_users(users):
+    _write([
+        (
+            _rowid("user", user.pk),
+            "teacher" if user.is_teacher else "student",
+            f"{user.first_name} {user.last_name}".strip() or user.username,
+            user.about,
+            f"{user.username} {user.email}",
+        )
+        for user in users
+    ])
+
+
+def index_quizzes(quizzes):
+    _write([(_rowid("quiz", quiz.pk), "quiz", quiz.title, quiz.about, "") for quiz in quizzes])
+
+
+def remove_from_index(kind, object_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+
+def rebuild_search_index():
+    with connection.cursor() as cursor:
+        for sql in REBUILD_SQL:
+            cursor.execute(sql)
+
+
+def build_query(text, columns=None):
+    """ FTS5 query matching every word of `text` as a prefix, None if there are no words """
+    tokens = TOKEN_RE.findall(text or "")[:MAX_TOKENS]
+    if not tokens:
+        return None
+    # Quoted, so user input is never parsed as FTS5 syntax
+    query = " ".join(f'"{token}"*' for token in tokens)
+    return f"{{{' '.join(columns)}}} : ({query})" if columns else query
+
+
+def search(text, kinds=PUBLIC_KINDS, limit=None):
+    """ Best matches as [{"kind", "id", "title"}], titles weigh more than descriptions """
+    query = build_query(text, ("title", "body"))
+    if not query:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(kinds))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""SELECT rowid >> 3, kind, title FROM {SEARCH_TABLE}
+                WHERE {SEARCH_TABLE} MATCH %s AND kind IN ({placeholders})
+                ORDER BY bm25({SEARCH_TABLE}, 0, 10.0, 1.0, 0) LIMIT %s""",
+            [query, *kinds, settings.SEARCH_RESULTS if limit is None else limit],
+        )
+        return [{"kind": kind, "id": object_id, "title": title} for object_id, kind, title in cursor.fetchall()]
+
+
+def matching_ids(kind, text):
+    """ Subquery of the ids of `kind` objects matching `text` in any column, None if there are no words """
+    query = build_query(text)
+    if not query:
+        return None
+    return RawSQL(
+        f"SELECT rowid >> 3 FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND (rowid & 7) = %s",
+        [query, KIND_CODES[kind]],
+    )
+
+
+class SearchIndexAdminMixin:
+    """ Admin search through the full-text index instead of LIKE scans """
+    search_index_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        ids = matching_ids(self.search_index_kind, search_term)
+        if ids is None:
+            return queryset.none(), False
+        return queryset.filter(pk__in=ids), False
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Subject
-from django.contrib.auth.hashers import check_password
+from .models import Subject, Quiz, QuizStats, Question, Choice
+from .images import schedule_thumbnails, delete_thumbnails
 
 
 # Serialize the subjects to send (if any)
@@ -123,6 +123,7 @@ class MyProfileSerializer(serializers.ModelSerializer):
             "is_student",
             "about",
             "profile_picture",
+            "profile_thumbnails",
             "date_joined",
         ]
 
@@ -138,6 +139,7 @@ class MyProfileSerializer(serializers.ModelSerializer):
             "is_student": {"required": False, "read_only": True},
             "about": {"required": False},
             "profile_picture": {"required": False, "use_url": False},
+            "profile_thumbnails": {"read_only": True},
             "date_joined": {'read_only': True, "required": False},
         }
 
@@ -204,7 +206,7 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({"confirm_password":["Please fill all fields to change your password."]})
             if new_password != confirm_password:
                 raise serializers.ValidationError({"confirm_password":["New Password and Confirm New Password are not same."]})
-            if not check_password(old_password, self.instance.password):
+            if not self.instance.check_password(old_password):
                 raise serializers.ValidationError({"password": ["Password is not correct."]})
             if len(new_password) < 8:
                 raise serializers.ValidationError({"new_password": ["Must be at least 8 characters."]})
@@ -233,24 +235,39 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         new_password = validated_data.get("password")
         profile_picture = validated_data.get("profile_picture")
 
+        # The instance may come from the authentication cache, so only the
+        # edited columns are written back, never a stale password or is_active
+        update_fields = []
         if first_name:
             instance.first_name = first_name
+            update_fields.append("first_name")
         if last_name:
             instance.last_name = last_name
+            update_fields.append("last_name")
         if about:
             instance.about = about
+            update_fields.append("about")
         if "subject" in validated_data:
             instance.subject.set(subject)
         if new_password:
             instance.set_password(new_password)
+            update_fields.append("password")
         
         if profile_picture:
             # Remove previous profile picture before save
             if instance.profile_picture:
-                instance.profile_picture.delete()
+                instance.profile_picture.delete(save=False)
+            delete_thumbnails(instance.profile_thumbnails)
+            instance.profile_thumbnails = {}
             instance.profile_picture = profile_picture
+            update_fields += ["profile_picture", "profile_thumbnails"]
         
-        instance.save()
+        if update_fields:
+            instance.save(update_fields=update_fields)
+
+        # Thumbnails are made outside the request
+        if profile_picture:
+            schedule_thumbnails(instance.pk)
         return instance
 
 
@@ -261,7 +278,7 @@ class DeleteAccountSerializer(serializers.Serializer):
 
     def validate_password(self, value):
         user = self.context.get("request").user
-        if not check_password(value, user.password):
+        if not user.check_password(value):
             raise serializers.ValidationError("Incorrect password.")
         return value
 
@@ -269,4 +286,118 @@ class DeleteAccountSerializer(serializers.Serializer):
         user = self.context.get("request").user
         if user.profile_picture:
             user.profile_picture.delete(save=False)
+        delete_thumbnails(user.profile_thumbnails)
         user.delete()
+
+
+
+class QuizOwnerSerializer(serializers.ModelSerializer):
+    """ Teacher who prepared a quiz """
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "first_name", "last_name"]
+        read_only_fields = fields
+
+
+
+class TeacherDirectorySerializer(serializers.ModelSerializer):
+    """ Teacher in the public directory """
+
+    # Read from the prefetched subjects, no query per teacher
+    subject = Subjects(many=True, read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "first_name", "last_name", "about", "profile_picture", "profile_thumbnails", "subject"]
+        read_only_fields = fields
+        extra_kwargs = {
+            "profile_picture": {"use_url": False},
+        }
+
+
+
+class QuizCatalogSerializer(serializers.ModelSerializer):
+    """ Quiz card in the catalog """
+
+    subject = Subjects(read_only=True)
+    quiz_owner = QuizOwnerSerializer(read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ["id", "title", "type", "about", "cover_image", "subject", "quiz_owner", "date"]
+        read_only_fields = fields
+        extra_kwargs = {
+            "cover_image": {"use_url": False},
+        }
+
+
+
+class QuizChoiceSerializer(serializers.ModelSerializer):
+    """ Choice of a question, without telling whether it is correct """
+
+    class Meta:
+        model = Choice
+        fields = ["id", "choice", "text"]
+        read_only_fields = fields
+
+
+
+class QuizQuestionSerializer(serializers.ModelSerializer):
+    """ Question of a quiz with its choices """
+
+    choices = QuizChoiceSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ["id", "question", "choices"]
+        read_only_fields = fields
+
+
+
+class QuizDetailSerializer(serializers.ModelSerializer):
+    """ Quiz sent to the students taking it """
+
+    questions = QuizQuestionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ["id", "title", "type", "about", "cover_image", "subject", "quiz_owner", "date", "questions"]
+        read_only_fields = fields
+        extra_kwargs = {
+            "cover_image": {"use_url": False},
+        }
+
+
+
+class QuizStatsSerializer(serializers.ModelSerializer):
+    """ Teacher dashboard of a quiz """
+
+    average_score = serializers.SerializerMethodField()
+    correct_rate = serializers.SerializerMethodField()
+    questions = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizStats
+        fields = [
+            "quiz", "question_count", "students", "completed", "correct", "answered", "graded",
+            "average_score", "correct_rate", "histogram", "questions", "updated",
+        ]
+        read_only_fields = fields
+
+    @staticmethod
+    def rate(correct, graded):
+        return round(correct / graded, 4) if graded else None
+
+    def get_average_score(self, obj):
+        """ Average number of correct answers per student """
+        return round(obj.correct / obj.students, 2) if obj.students else None
+
+    def get_correct_rate(self, obj):
+        return self.rate(obj.correct, obj.graded)
+
+    def get_questions(self, obj):
+        return {
+            question_id: {**counts, "correct_rate": self.rate(counts["correct"], counts["graded"])}
+            for question_id, counts in obj.questions.items()
+        }
@@ -0,0 +1,124 @@
+import time
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import User, Subject, Quiz, Question, Choice
+from .catalog import bump_catalog_version
+from .authentication import invalidate_cached_user
+from .grading import solutions_graded
+from .stats import apply_graded
+from .quiz_payload import invalidate_quiz_payloads
+from .leaderboard import apply_graded_scores, bump_generation, leaderboards
+from .search import index_subjects, index_users, index_quizzes, remove_from_index
+
+
+# https://docs.djangoproject.com/en/5.1/topics/signals/
+def invalidate_subject_catalog():
+    # Written in the transaction of the change, other requests see the new version on commit
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def subject_changed(sender, **kwargs):
+    invalidate_subject_catalog()
+
+
+@receiver(m2m_changed, sender=User.subject.through)
+def subject_teachers_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_subject_catalog()
+
+
+# Profile updates, password changes and account deletion all save or delete the user row
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Deleted instances lose their pk before on_commit callbacks run
+    user_id = instance.pk
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+# Scores are deleted with their student or subject, other processes load
+# their leaderboards again on their next sync (leaderboard.py)
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    if instance.is_student:
+        bump_generation()
+        user_id = instance.pk
+        transaction.on_commit(lambda: leaderboards.remove_student(user_id))
+
+
+@receiver(post_delete, sender=Subject)
+def subject_deleted(sender, instance, **kwargs):
+    bump_generation()
+    transaction.on_commit(leaderboards.clear)
+
+
+# Runs inside the grading transaction, statistics and grades are committed together
+@receiver(solutions_graded)
+def quiz_solutions_graded(sender, quiz_id, results, questions, **kwargs):
+    apply_graded(quiz_id, results, questions)
+    apply_graded_scores(quiz_id, results)
+
+
+# Anything in the students' quiz payload (quiz_payload.py)
+@receiver(pre_save, sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    # Saved with the row, no extra query
+    instance.version = time.time_ns()
+
+
+def deleted_with_quiz(origin):
+    # Questions and choices deleted along with their quiz (or its owner) need no
+    # new version, the quiz is gone, and are not worth a query per row.
+    # `origin` is what delete() was called on, None for saves
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model not in (Question, Choice)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, origin=None, **kwargs):
+    if not deleted_with_quiz(origin):
+        invalidate_quiz_payloads(Quiz.objects.filter(pk=instance.quiz_id))
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_changed(sender, instance, origin=None, **kwargs):
+    if not deleted_with_quiz(origin):
+        invalidate_quiz_payloads(Quiz.objects.filter(questions=instance.question_id))
+
+
+# Full-text search index (search.py), written in the same transaction as the rows
+INDEXED_USER_FIELDS = {"username", "email", "first_name", "last_name", "about", "is_teacher"}
+
+
+@receiver(post_save, sender=Subject)
+def index_subject(sender, instance, **kwargs):
+    index_subjects([instance])
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    # Logins only save last_login
+    if update_fields is None or INDEXED_USER_FIELDS.intersection(update_fields):
+        index_users([instance])
+
+
+@receiver(post_save, sender=Quiz)
+def index_quiz(sender, instance, **kwargs):
+    index_quizzes([instance])
+
+
+@receiver(post_delete, sender=Subject)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Quiz)
+def remove_from_search_index(sender, instance, **kwargs):
+    kind = {Subject: "subject", User: "user", Quiz: "quiz"}[sender]
+    remove_from_index(kind, instance.pk)
@@ -0,0 +1,103 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, Q
+from .models import Question, QuizResult, QuizStats, StudentSolution
+
+
+# Per-quiz statistics
+# QuizStats keeps running sums, per-question counts and a score histogram of a
+# quiz. Every graded batch (grading.solutions_graded) is added to it in the
+# grading transaction, so the teacher dashboard reads one row by primary key
+# instead of aggregating every StudentSolution of the quiz.
+# Deleted solutions or students are only reflected after rebuild_quiz_stats().
+
+HISTOGRAM_BUCKETS = 10
+
+
+def score_bucket(correct, question_count):
+    """ Histogram bucket of a score, 100% goes into the last bucket """
+    if not question_count:
+        return 0
+    return min(correct * HISTOGRAM_BUCKETS // question_count, HISTOGRAM_BUCKETS - 1)
+
+
+def _add(stats, result, sign):
+    """ Add (sign=1) or remove (sign=-1) a student's result from the quiz totals """
+    stats.correct += sign * result.correct
+    stats.answered += sign * result.answered
+    stats.graded += sign * result.graded
+    stats.histogram[score_bucket(result.correct, stats.question_count)] += sign
+    if result.graded >= stats.question_count:
+        stats.completed += sign
+
+
+def apply_graded(quiz_id, results, questions):
+    """ Add one graded batch to the statistics of a quiz """
+    question_count = Question.objects.filter(quiz_id=quiz_id).count()
+    stats = QuizStats.objects.filter(pk=quiz_id).first()
+    if stats is None or stats.question_count != question_count:
+        # First batch, or questions were added / removed since: the batch is
+        # already written, so counting from scratch includes it
+        return rebuild_quiz_stats(quiz_id)
+
+    existing = {
+        result.student_id: result
+        for result in QuizResult.objects.filter(quiz_id=quiz_id, student_id__in=list(results))
+    }
+    created, changed = [], []
+    for student_id, counts in results.items():
+        result = existing.get(student_id)
+        if result is None:
+            result = QuizResult(quiz_id=quiz_id, student_id=student_id)
+            created.append(result)
+            stats.students += 1
+        else:
+            _add(stats, result, -1)
+            changed.append(result)
+        result.correct += counts["correct"]
+        result.answered += counts["answered"]
+        result.graded += counts["graded"]
+        _add(stats, result, 1)
+
+    for question_id, counts in questions.items():
+        total = Counter(stats.questions.get(str(question_id), {}))
+        total.update(counts)
+        stats.questions[str(question_id)] = dict(total)
+
+    QuizResult.objects.bulk_create(created)
+    QuizResult.objects.bulk_update(changed, ["correct", "answered", "graded", "date"])
+    stats.save()
+    return stats
+
+
+@transaction.atomic
+def rebuild_quiz_stats(quiz_id):
+    """ Recompute the results and statistics of a quiz from its graded solutions """
+    graded = StudentSolution.objects.filter(solved_quiz_id=quiz_id, is_correct__isnull=False)
+    counts = {
+        "correct": Count("id", filter=Q(is_correct=True)),
+        "answered": Count("student_answer"),
+        "graded": Count("id"),
+    }
+
+    stats = QuizStats(
+        quiz_id=quiz_id,
+        question_count=Question.objects.filter(quiz_id=quiz_id).count(),
+        histogram=[0] * HISTOGRAM_BUCKETS,
+    )
+    results = [
+        QuizResult(quiz_id=quiz_id, student_id=row.pop("student_id"), **row)
+        for row in graded.order_by().values("student_id").annotate(**counts)
+    ]
+    for result in results:
+        stats.students += 1
+        _add(stats, result, 1)
+    stats.questions = {
+        str(row.pop("solved_question_id")): row
+        for row in graded.order_by().values("solved_question_id").annotate(**counts)
+    }
+
+    QuizResult.objects.filter(quiz_id=quiz_id).delete()
+    QuizResult.objects.bulk_create(results, batch_size=1000)
+    stats.save()
+    return stats
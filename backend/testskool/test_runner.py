@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from .metrics import registry
+
+
+# Test runner keeping the test suite off the files shared with the dev server
+# Throttling buckets and metrics go to a temporary directory removed after the run.
+# https://docs.djangoproject.com/en/5.1/topics/testing/advanced/#defining-a-test-runner
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.store_dir = tempfile.mkdtemp(prefix="testskool-tests-")
+        self.store_settings = override_settings(
+            THROTTLE_STORE_PATH=f"{self.store_dir}/throttle.sqlite3",
+            METRICS_STORE_PATH=f"{self.store_dir}/metrics.sqlite3",
+        )
+        self.store_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # Observations still pending would be flushed to the real store at exit
+        registry.flush()
+        self.store_settings.disable()
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,105 @@
+import threading
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+from .. import throttling
+from ..models import Subject
+from ..throttling import SharedAnonRateThrottle
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        self.user = get_user_model().objects.create_user(
+            username="teacher-user",
+            password="password",
+            first_name="John",
+            is_teacher=True,
+        )
+        self.user.subject.add(self.math, self.art)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+
+    async def test_subject_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse("async-subject-list"))
+        sync_response = await sync_to_async(APIClient().get)(reverse("subject-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync_response.content)
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+
+    async def test_subject_list_conditional_get(self):
+        etag = (await self.async_client.get(reverse("async-subject-list")))["ETag"]
+        response = await self.async_client.get(reverse("async-subject-list"), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+
+    async def test_my_profile_matches_sync_view(self):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        response = await self.async_client.get(reverse("async-my-profile"), headers=headers)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        sync_response = await sync_to_async(client.get)(reverse("my-profile"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(len(response.json()["subject"]), 2)
+
+
+    async def test_my_profile_requires_authentication(self):
+        response = await self.async_client.get(reverse("async-my-profile"))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+
+    async def test_my_profile_invalid_token(self):
+        headers = {"Authorization": "Bearer not-a-token"}
+        response = await self.async_client.get(reverse("async-my-profile"), headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+
+    async def test_post_not_allowed(self):
+        response = await self.async_client.post(reverse("async-subject-list"))
+        self.assertEqual(response.status_code, 405)
+
+
+    @override_settings(REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_CLASSES': ['testskool.throttling.SharedAnonRateThrottle'],
+    })
+    async def test_throttled_off_the_event_loop(self):
+        threads = []
+        allow_request = SharedAnonRateThrottle.allow_request
+
+        def recording_allow_request(throttle, request, view):
+            threads.append(threading.get_ident())
+            return allow_request(throttle, request, view)
+
+        throttling.throttle_store.reset()
+        with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"anon": "1/minute"}), \
+                mock.patch.object(SharedAnonRateThrottle, "allow_request", recording_allow_request):
+            first = await self.async_client.get(reverse("async-subject-list"))
+            second = await self.async_client.get(reverse("async-subject-list"))
+
+        self.assertEqual((first.status_code, second.status_code), (200, 429))
+        self.assertIn("Retry-After", second)
+        self.assertNotIn(threading.get_ident(), threads)
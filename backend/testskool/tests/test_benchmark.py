@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.core.cache import cache
+from ..benchmark import percentile, compare, run_benchmark
+
+
+class BenchmarkStatisticsTest(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+    def test_compare_with_baseline(self):
+        baseline = {"my-profile": {"p95_ms": 10, "rps": 100, "queries_per_request": 1}}
+        same = {"my-profile": {"p95_ms": 11, "rps": 95, "queries_per_request": 1}}
+        slower = {"my-profile": {"p95_ms": 20, "rps": 40, "queries_per_request": 2}}
+
+        self.assertEqual(compare(same, baseline, 0.2), [])
+        self.assertEqual(len(compare(slower, baseline, 0.2)), 3)
+        self.assertEqual(compare({"new-endpoint": slower["my-profile"]}, baseline, 0.2), [])
+
+
+
+# Worker threads use their own connections, so the seeded data must be committed
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkRunTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+
+    def test_run_every_endpoint(self):
+        # One worker thread, the in-memory test database locks tables on concurrent writes
+        results = run_benchmark(requests=4, concurrency=1, teachers=3, students=5)
+
+        self.assertEqual(set(results), {
+            "subject-list", "token_obtain_pair", "token_refresh", "register",
+            "my-profile", "edit-profile", "delete-account",
+        })
+        for name, result in results.items():
+            self.assertEqual(result["requests"], 4, name)
+            self.assertEqual(result["errors"], 0, name)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["peak_rss_mb"], 0)
@@ -0,0 +1,144 @@
+import json
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.test import override_settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from ..models import Subject
+from ..roster import hash_pool
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    ROSTER_HASH_WORKERS=1,
+)
+class BulkRegisterViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("bulk-register")
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        self.admin = get_user_model().objects.create_superuser(username="admin", password="12345678")
+        self.client.force_authenticate(user=self.admin)
+
+
+    def upload(self, name, content, **data):
+        roster = SimpleUploadedFile(name, content.encode("utf-8"))
+        return self.client.post(self.url, {"roster": roster, **data}, format="multipart")
+
+
+    def test_csv_roster(self):
+        content = (
+            "username,password,is_teacher,subject,first_name\n"
+            "student1,password1,false,,Ada\n"
+            "teacher1,password1,true,Math;Art,Alan\n"
+        )
+        response = self.upload("roster.csv", content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 0)
+
+        student = get_user_model().objects.get(username="student1")
+        self.assertTrue(student.is_student)
+        self.assertFalse(student.is_teacher)
+        self.assertEqual(student.first_name, "Ada")
+        self.assertTrue(student.check_password("password1"))
+
+        teacher = get_user_model().objects.get(username="teacher1")
+        self.assertTrue(teacher.is_teacher)
+        self.assertEqual(set(teacher.subject.all()), {self.math, self.art})
+
+
+    def test_jsonl_roster(self):
+        content = "\n".join(json.dumps(row) for row in [
+            {"username": "teacher2", "password": "password1", "is_teacher": True, "subject": ["Art"]},
+            {"username": "student2", "password": "password1"},
+        ])
+        response = self.upload("roster.jsonl", content)
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(list(self.art.teachers.values_list("username", flat=True)), ["teacher2"])
+
+
+    def test_per_row_report(self):
+        content = (
+            "username,password,is_teacher,subject\n"
+            "ok,password1,false,\n"
+            "short,pass,false,\n"
+            "ok,password1,false,\n"
+            "admin,password1,false,\n"
+            "nosubject,password1,true,Physics\n"
+            "student,password1,false,Math\n"
+        )
+        response = self.upload("roster.csv", content)
+        rows = response.data["rows"]
+
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["failed"], 5)
+        self.assertEqual([row["row"] for row in rows], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(rows[0]["status"], "created")
+        self.assertEqual(rows[0]["id"], get_user_model().objects.get(username="ok").id)
+        self.assertEqual(rows[1]["errors"], {"password": ["Password must be at least 8 characters."]})
+        self.assertIn("username", rows[2]["errors"])
+        self.assertIn("username", rows[3]["errors"])
+        self.assertEqual(rows[4]["errors"], {"subject": ["Please select your subject(s)."]})
+        self.assertEqual(rows[5]["errors"], {"subject": ["Only teachers can choose a subject."]})
+
+
+    def test_invalid_email(self):
+        content = (
+            "username,password,email\n"
+            "valid,password1,valid@example.com\n"
+            "invalid,password1,not an email\n"
+            "empty,password1,\n"
+        )
+        rows = self.upload("roster.csv", content).data["rows"]
+
+        self.assertEqual([row["status"] for row in rows], ["created", "error", "created"])
+        self.assertEqual(rows[1]["errors"], {"email": ["Enter a valid email address."]})
+        self.assertEqual(get_user_model().objects.get(username="valid").email, "valid@example.com")
+
+
+    # Spawned hashing processes load the real settings, whose default hasher is PBKDF2
+    @override_settings(
+        ROSTER_HASH_WORKERS=2, ROSTER_BATCH_SIZE=3,
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    )
+    def test_process_pool_and_batches(self):
+        content = "username,password\n" + "".join(f"user{i},password{i}\n" for i in range(7))
+        response = self.upload("roster.csv", content)
+
+        self.assertEqual(response.data["created"], 7)
+        self.assertTrue(get_user_model().objects.get(username="user6").check_password("password6"))
+
+        # The next request reuses the pool instead of starting processes again
+        pool = hash_pool(2)
+        self.upload("roster.csv", "username,password\nuser7,password7\n")
+        self.assertIs(hash_pool(2), pool)
+        self.assertTrue(get_user_model().objects.get(username="user7").check_password("password7"))
+
+
+    def test_missing_file_returns_400(self):
+        response = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_unknown_format_returns_400(self):
+        response = self.upload("roster.xlsx", "username\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_non_admin_is_forbidden(self):
+        user = get_user_model().objects.create_user(username="user", password="12345678")
+        self.client.force_authenticate(user=user)
+        response = self.upload("roster.csv", "username,password\nx,password1\n")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
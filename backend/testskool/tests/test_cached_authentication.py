@@ -0,0 +1,77 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.test import override_settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test-user",
+            password="password",
+            first_name="Test",
+            is_student=True,
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("my-profile")
+
+
+    def test_second_request_uses_cached_user(self):
+        # User row and subjects
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        # Subjects only
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "test-user")
+
+
+    def test_profile_update_invalidates_cache(self):
+        self.client.get(self.url)
+        self.client.put(reverse("edit-profile"), {"first_name": "Changed"}, format="multipart")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["first_name"], "Changed")
+
+
+    def test_password_change_invalidates_cache(self):
+        self.client.get(self.url)
+        self.user.set_password("new-password")
+        self.user.save()
+
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+    def test_deleted_account_rejected(self):
+        self.client.get(self.url)
+        response = self.client.delete(reverse("delete-account"), {"password": "password"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
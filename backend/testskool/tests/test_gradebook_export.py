@@ -0,0 +1,112 @@
+import csv
+import io
+from datetime import datetime, timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Answer, Choice, Question, Quiz, StudentSolution, Subject
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    GRADEBOOK_CHUNK_SIZE=2,
+)
+class GradebookExportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("gradebook-export")
+        User = get_user_model()
+        self.teacher = User.objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.other = User.objects.create_user(username="other", password="12345678", is_teacher=True)
+        self.student = User.objects.create_user(username="student", password="12345678", is_student=True,
+                                                first_name="Sam", last_name="Smith")
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        self.quizzes = [
+            Quiz.objects.create(quiz_owner=self.teacher, subject=self.math, type="test", title="Algebra"),
+            Quiz.objects.create(quiz_owner=self.teacher, subject=self.art, type="test", title="Colors"),
+            Quiz.objects.create(quiz_owner=self.other, subject=self.math, type="test", title="Other"),
+        ]
+        for day, quiz in enumerate(self.quizzes, start=1):
+            question = Question.objects.create(quiz=quiz, question="?")
+            choice = Choice.objects.create(question=question, choice="A", text="A")
+            Answer.objects.create(question=question, answer=choice)
+            for is_correct in (True, None):
+                StudentSolution.objects.create(
+                    student=self.student, solved_quiz=quiz, solved_question=question, student_answer=choice,
+                    is_correct=is_correct, date=datetime(2026, 3, day, 12, tzinfo=timezone.utc),
+                )
+
+    def export(self, user, accept=None, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url, params, **({"HTTP_ACCEPT": accept} if accept else {}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_export(self):
+        rows = self.export(self.teacher)
+
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row["quiz"] for row in rows}, {"Algebra", "Colors"})
+        self.assertEqual(rows[0]["username"], "student")
+        self.assertEqual(rows[0]["last_name"], "Smith")
+        self.assertEqual(rows[0]["subject"], "Math")
+        self.assertEqual(rows[0]["answer"], "A")
+        self.assertEqual([row["result"] for row in rows[:2]], ["correct", "ungraded"])
+
+    def test_accept_csv(self):
+        self.assertEqual(len(self.export(self.teacher, accept="text/csv")), 4)
+
+        # Errors stay JSON
+        response = self.client.get(self.url, {"quiz": "x"}, HTTP_ACCEPT="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"quiz": ["A valid integer is required."]})
+
+    def test_filters(self):
+        self.assertEqual({row["quiz"] for row in self.export(self.teacher, subject=self.art.id)}, {"Colors"})
+        self.assertEqual({row["quiz"] for row in self.export(self.teacher, quiz=self.quizzes[0].id)}, {"Algebra"})
+        self.assertEqual(
+            {row["quiz"] for row in self.export(self.teacher, date_from="2026-03-02", date_to="2026-03-02")}, {"Colors"}
+        )
+
+    def test_admin_exports_every_quiz(self):
+        admin = get_user_model().objects.create_superuser(username="admin", password="12345678", email="a@example.com")
+
+        self.assertEqual(len(self.export(admin)), 6)
+
+    def test_invalid_filters(self):
+        self.client.force_authenticate(self.teacher)
+
+        self.assertEqual(self.client.get(self.url, {"quiz": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"date_from": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"date_from": "2024-02-30"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"date_from": ["Enter a date as YYYY-MM-DD."]})
+
+    def test_formulas_are_escaped(self):
+        get_user_model().objects.filter(pk=self.student.pk).update(first_name="=HYPERLINK(\"x\")", last_name="@SUM(A1)")
+        self.quizzes[0].title = "-2+3"
+        self.quizzes[0].save()
+
+        row = self.export(self.teacher, quiz=self.quizzes[0].id)[0]
+        self.assertEqual((row["first_name"], row["last_name"], row["quiz"]), ("'=HYPERLINK(\"x\")", "'@SUM(A1)", "'-2+3"))
+        self.assertEqual(row["username"], "student")
+
+    def test_students_cannot_export(self):
+        self.client.force_authenticate(self.student)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
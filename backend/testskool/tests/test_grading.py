@@ -0,0 +1,117 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from ..grading import AnswerKey, grade_quiz, solutions_graded
+from ..models import Answer, Choice, Question, Quiz, StudentSolution, Subject
+
+
+@override_settings(GRADING_UPDATE_CHUNK=2)
+class GradeQuizTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        teacher = User.objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.student1 = User.objects.create_user(username="student1", password="12345678", is_student=True)
+        self.student2 = User.objects.create_user(username="student2", password="12345678", is_student=True)
+        subject = Subject.objects.create(name="Math")
+        self.quiz = Quiz.objects.create(quiz_owner=teacher, subject=subject, type="test", title="Quiz")
+
+        self.questions = []
+        self.answers = []
+        for i in range(3):
+            question = Question.objects.create(quiz=self.quiz, question=f"Question {i}")
+            choices = [Choice.objects.create(question=question, choice=letter, text=letter) for letter in "ABCD"]
+            Answer.objects.create(question=question, answer=choices[i])
+            self.questions.append(choices)
+            self.answers.append(choices[i])
+
+    def solve(self, student, picks):
+        for choices, pick in zip(self.questions, picks):
+            StudentSolution.objects.create(
+                student=student, solved_quiz=self.quiz, solved_question=choices[0].question,
+                student_answer=choices[pick] if pick is not None else None,
+            )
+
+    def test_grades_solutions(self):
+        self.solve(self.student1, [0, 1, 2])
+        self.solve(self.student2, [0, 3, None])
+
+        results = grade_quiz(self.quiz.id)
+
+        self.assertEqual(results, {
+            self.student1.id: {"correct": 3, "answered": 3, "graded": 3},
+            self.student2.id: {"correct": 1, "answered": 2, "graded": 3},
+        })
+        self.assertEqual(StudentSolution.objects.filter(is_correct=True).count(), 4)
+        self.assertEqual(StudentSolution.objects.filter(is_correct=False).count(), 2)
+        self.assertFalse(StudentSolution.objects.filter(is_correct__isnull=True).exists())
+
+    def test_grades_in_batches(self):
+        self.solve(self.student1, [0, 1, 2])
+        self.solve(self.student2, [1, 1, 1])
+        batches = []
+
+        def receiver(sender, quiz_id, results, questions, **kwargs):
+            batches.append(results)
+        solutions_graded.connect(receiver)
+        self.addCleanup(solutions_graded.disconnect, receiver)
+
+        results = grade_quiz(self.quiz.id, batch_size=4)
+
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(sum(r["graded"] for batch in batches for r in batch.values()), 6)
+        self.assertEqual(results[self.student1.id], {"correct": 3, "answered": 3, "graded": 3})
+        self.assertEqual(results[self.student2.id], {"correct": 1, "answered": 3, "graded": 3})
+
+    def test_only_grades_ungraded_solutions(self):
+        self.solve(self.student1, [0, 1, 2])
+        grade_quiz(self.quiz.id)
+        self.solve(self.student2, [0, 0, 0])
+
+        results = grade_quiz(self.quiz.id)
+
+        self.assertEqual(list(results), [self.student2.id])
+        self.assertEqual(StudentSolution.objects.filter(student=self.student1, is_correct=True).count(), 3)
+
+    def test_overlapping_runs_count_once(self):
+        self.solve(self.student1, [0, 1, 2])
+        self.solve(self.student2, [0, 0, 0])
+        graded = []
+
+        def receiver(sender, quiz_id, results, questions, **kwargs):
+            graded.append(results)
+        solutions_graded.connect(receiver)
+        self.addCleanup(solutions_graded.disconnect, receiver)
+
+        # Another run grades student2 between this run's read and its update
+        grade = AnswerKey.grade
+
+        def overlapping_grade(answer_key, rows):
+            if not graded:
+                StudentSolution.objects.filter(student=self.student2).update(is_correct=False)
+            return grade(answer_key, rows)
+
+        with mock.patch.object(AnswerKey, "grade", overlapping_grade):
+            results = grade_quiz(self.quiz.id)
+
+        self.assertEqual(results, {self.student1.id: {"correct": 3, "answered": 3, "graded": 3}})
+        self.assertEqual(graded, [results])
+        self.assertEqual(StudentSolution.objects.filter(student=self.student2, is_correct=False).count(), 3)
+
+    def test_filters_students(self):
+        self.solve(self.student1, [0, 1, 2])
+        self.solve(self.student2, [0, 1, 2])
+
+        results = grade_quiz(self.quiz.id, students=[self.student2.id])
+
+        self.assertEqual(list(results), [self.student2.id])
+        self.assertEqual(StudentSolution.objects.filter(student=self.student1, is_correct__isnull=True).count(), 3)
+
+    def test_command(self):
+        self.solve(self.student1, [0, 1, 2])
+        out = StringIO()
+
+        call_command("grade_quiz", self.quiz.id, stdout=out)
+
+        self.assertIn("Graded 3 answer(s) of 1 student(s).", out.getvalue())
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportRosterCommandTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+
+    def test_import_with_report(self):
+        roster = self.write("roster.jsonl", '{"username": "a1", "password": "password1"}\nnot json\n')
+        report = os.path.join(self.dir.name, "report.jsonl")
+        out, err = StringIO(), StringIO()
+
+        call_command("import_roster", roster, "--workers", "1", "--report", report, stdout=out, stderr=err)
+
+        self.assertIn("Created 1 account(s), 1 row(s) failed.", out.getvalue())
+        self.assertIn("Row 2", err.getvalue())
+        self.assertTrue(get_user_model().objects.filter(username="a1").exists())
+        with open(report, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([entry["status"] for entry in entries], ["created", "error"])
+
+
+    def test_unknown_format(self):
+        roster = self.write("roster.txt", "")
+        with self.assertRaises(CommandError):
+            call_command("import_roster", roster)
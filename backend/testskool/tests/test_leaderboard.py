@@ -0,0 +1,176 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..grading import grade_quiz
+from ..leaderboard import Leaderboard, leaderboards
+from ..models import Answer, Choice, Question, Quiz, QuizResult, StudentSolution, Subject, SubjectScore
+
+
+class LeaderboardTest(SimpleTestCase):
+    def test_ranking(self):
+        board = Leaderboard()
+        for student_id, score in ((1, 5), (2, 9), (3, 5), (4, 1)):
+            board.set(student_id, score)
+        board.set(4, 7)
+
+        self.assertEqual(board.top(3), [(1, 2, 9), (2, 4, 7), (3, 1, 5)])
+        self.assertEqual(board.rank(3), (3, 5))
+        self.assertIsNone(board.rank(5))
+
+        board.discard(2)
+        self.assertEqual(len(board), 3)
+        self.assertEqual(board.rank(4), (1, 7))
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class SubjectLeaderboardTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboards.clear()
+        self.addCleanup(leaderboards.clear)
+        User = get_user_model()
+        teacher = User.objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.students = [
+            User.objects.create_user(username=f"student{i}", password="12345678", is_student=True)
+            for i in range(4)
+        ]
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        self.quiz = Quiz.objects.create(quiz_owner=teacher, subject=self.math, type="test", title="Quiz")
+        self.url = reverse("subject-leaderboard", kwargs={"pk": self.math.id})
+
+        self.questions = []
+        for i in range(3):
+            question = Question.objects.create(quiz=self.quiz, question=f"Question {i}")
+            choices = [Choice.objects.create(question=question, choice=letter, text=letter) for letter in "AB"]
+            Answer.objects.create(question=question, answer=choices[0])
+            self.questions.append(choices)
+
+    def solve(self, student, picks):
+        for choices, pick in zip(self.questions, picks):
+            StudentSolution.objects.create(
+                student=student, solved_quiz=self.quiz, solved_question=choices[0].question, student_answer=choices[pick]
+            )
+
+    def grade(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            grade_quiz(self.quiz.id)
+
+    def test_scores_updated_while_grading(self):
+        self.solve(self.students[0], [0, 0, 1])
+        self.solve(self.students[1], [1, 1, 1])
+        self.grade()
+        self.solve(self.students[0], [0, 1, 1])
+        self.grade()
+
+        scores = dict(SubjectScore.objects.filter(subject=self.math).values_list("student_id", "score"))
+        self.assertEqual(scores, {self.students[0].id: 3, self.students[1].id: 0})
+
+    def test_leaderboard(self):
+        for student, picks in zip(self.students, ([0, 0, 0], [0, 1, 1], [1, 0, 1])):
+            self.solve(student, picks)
+        self.grade()
+        self.client.force_authenticate(self.students[2])
+
+        response = self.client.get(self.url, {"limit": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["students"], 3)
+        self.assertEqual([(row["rank"], row["score"]) for row in response.data["top"]], [(1, 3), (2, 1)])
+        self.assertEqual(response.data["top"][0]["student"]["username"], "student0")
+        self.assertEqual(response.data["me"], {"rank": 2, "score": 1})
+
+    def test_leaderboard_served_from_memory(self):
+        self.solve(self.students[0], [0, 0, 0])
+        self.grade()
+        self.client.force_authenticate(self.students[3])
+        self.client.get(self.url)
+
+        # Only the catalog version and the names of the top students are read
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertIsNone(response.data["me"])
+
+    def test_syncs_scores_of_other_processes(self):
+        self.client.force_authenticate(self.students[0])
+        self.client.get(self.url)
+        SubjectScore.objects.create(subject=self.math, student=self.students[0], score=7, updated=timezone.now())
+        leaderboards.next_sync = 0
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["me"], {"rank": 1, "score": 7})
+
+    def test_syncs_removals_of_other_processes(self):
+        for student, picks in zip(self.students, ([0, 0, 0], [0, 1, 1], [1, 0, 1])):
+            self.solve(student, picks)
+        self.grade()
+        self.client.force_authenticate(self.students[2])
+        self.client.get(self.url)
+
+        # Deleted in another process, its on-commit callbacks do not run here
+        self.students[0].delete()
+        leaderboards.next_sync = 0
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["students"], 2)
+        self.assertEqual(response.data["top"][0]["student"]["username"], "student1")
+        self.assertEqual(response.data["me"], {"rank": 1, "score": 1})
+
+    def test_syncs_rebuilds_of_other_processes(self):
+        self.solve(self.students[0], [0, 0, 0])
+        self.grade()
+        self.client.force_authenticate(self.students[0])
+        self.client.get(self.url)
+        QuizResult.objects.all().delete()
+
+        call_command("rebuild_leaderboards", stdout=StringIO())
+        leaderboards.next_sync = 0
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["students"], 0)
+        self.assertIsNone(response.data["me"])
+
+    def test_unknown_subject(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.get(reverse("subject-leaderboard", kwargs={"pk": self.art.id + 1}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_limit(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.get(self.url, {"limit": "ten"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        self.solve(self.students[0], [0, 0, 1])
+        self.grade()
+        SubjectScore.objects.all().delete()
+        out = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_leaderboards", stdout=out)
+
+        self.assertEqual(SubjectScore.objects.get(student=self.students[0]).score, 2)
+        self.assertIn("Rebuilt 1 subject score(s).", out.getvalue())
@@ -0,0 +1,182 @@
+import asyncio
+import json
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..live import CLOSE_NOT_FOUND, CLOSE_UNAUTHORIZED, live_application, sessions
+from ..models import Answer, Choice, Question, Quiz, QuizStats, StudentSolution, Subject
+
+
+class Connection:
+    """ WebSocket client talking to the ASGI application directly """
+
+    def __init__(self, path, token=None):
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+        scope = {"type": "websocket", "path": path, "query_string": f"token={token}".encode() if token else b""}
+        self.task = asyncio.create_task(live_application(scope, self.inbox.get, self.outbox.put))
+        self.inbox.put_nowait({"type": "websocket.connect"})
+
+    async def event(self):
+        return await asyncio.wait_for(self.outbox.get(), 5)
+
+    async def receive(self, message_type, **fields):
+        """ Next message of a type (and field values), skipping the others """
+        while True:
+            event = await self.event()
+            self.last_event = event
+            if event["type"] != "websocket.send":
+                return None
+            message = json.loads(event["text"])
+            if message["type"] == message_type and all(message.get(k) == v for k, v in fields.items()):
+                return message
+
+    async def send(self, **message):
+        await self.inbox.put({"type": "websocket.receive", "text": json.dumps(message)})
+
+    async def close(self):
+        await self.inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(self.task, 5)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    LIVE_TALLY_INTERVAL=0,
+    LIVE_FLUSH_INTERVAL=60,
+    LIVE_FLUSH_SIZE=2,
+)
+class LiveSessionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        sessions.clear()
+        User = get_user_model()
+        self.teacher = User.objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.students = [
+            User.objects.create_user(username=f"student{i}", password="12345678", is_student=True) for i in range(3)
+        ]
+        subject = Subject.objects.create(name="Math")
+        self.quiz = Quiz.objects.create(quiz_owner=self.teacher, subject=subject, type="live", title="Live")
+        self.choices = []
+        for i in range(2):
+            question = Question.objects.create(quiz=self.quiz, question=f"Question {i}")
+            choices = [Choice.objects.create(question=question, choice=letter, text=letter) for letter in "AB"]
+            Answer.objects.create(question=question, answer=choices[0])
+            self.choices.append(choices)
+        self.path = f"/ws/live/{self.quiz.id}/"
+
+    def token(self, user):
+        return str(RefreshToken.for_user(user).access_token)
+
+    async def test_live_session(self):
+        host = Connection(self.path, self.token(self.teacher))
+        self.assertEqual((await host.event())["type"], "websocket.accept")
+        state = await host.receive("state")
+        self.assertEqual((state["status"], state["count"]), ("waiting", 2))
+
+        students = [Connection(self.path, self.token(student)) for student in self.students]
+        for student in students:
+            await student.receive("state")
+
+        await host.send(action="start")
+        states = [await student.receive("state", status="running") for student in students]
+        self.assertEqual({state["question"]["question"] for state in states}, {"Question 0"})
+        self.assertNotIn("answer", json.dumps(states[0]))
+
+        await students[0].send(action="answer", choice=self.choices[0][0].id)
+        await students[1].send(action="answer", choice=self.choices[0][1].id)
+        self.assertEqual((await students[0].receive("answered"))["question"], self.choices[0][0].question_id)
+        await students[1].receive("answered")
+
+        tally = await host.receive("tally")
+        if tally["answers"] < 2:
+            tally = await host.receive("tally", answers=2)
+        self.assertEqual(tally["choices"], {str(self.choices[0][0].id): 1, str(self.choices[0][1].id): 1})
+
+        await students[0].send(action="answer", choice=self.choices[0][1].id)
+        self.assertEqual((await students[0].receive("error"))["detail"], "Already answered.")
+        await students[2].send(action="start")
+        self.assertIn("Unknown action", (await students[2].receive("error"))["detail"])
+
+        await host.send(action="next")
+        await students[2].receive("state", index=1)
+        await students[2].send(action="answer", choice=self.choices[1][0].id)
+        await students[2].receive("answered")
+
+        await host.send(action="end")
+        await students[0].receive("state", status="ended")
+        graded = StudentSolution.objects.filter(solved_quiz=self.quiz)
+        self.assertEqual(await graded.acount(), 3)
+        self.assertEqual(await graded.filter(is_correct=True).acount(), 2)
+        self.assertEqual((await QuizStats.objects.aget(pk=self.quiz.id)).students, 3)
+
+        for connection in [host, *students]:
+            await connection.close()
+        self.assertNotIn(self.quiz.id, sessions)
+
+    async def test_answers_graded_when_everybody_leaves(self):
+        host = Connection(self.path, self.token(self.teacher))
+        student = Connection(self.path, self.token(self.students[0]))
+        await student.receive("state")
+        await host.send(action="start")
+        await student.receive("state", status="running")
+
+        await student.send(action="answer", choice=self.choices[0][0].id)
+        await student.receive("answered")
+        await student.close()
+        await host.close()
+
+        self.assertEqual(await StudentSolution.objects.filter(is_correct__isnull=True).acount(), 0)
+        self.assertEqual(await StudentSolution.objects.filter(is_correct=True).acount(), 1)
+        self.assertEqual((await QuizStats.objects.aget(pk=self.quiz.id)).students, 1)
+
+    async def test_no_second_answer_in_a_new_session(self):
+        for attempt in range(2):
+            host = Connection(self.path, self.token(self.teacher))
+            student = Connection(self.path, self.token(self.students[0]))
+            await student.receive("state")
+            await host.send(action="start")
+            await student.receive("state", status="running")
+            await student.send(action="answer", choice=self.choices[0][1].id)
+            reply = await student.receive("error" if attempt else "answered")
+            await host.send(action="end")
+            await student.receive("state", status="ended")
+            await student.close()
+            await host.close()
+
+        self.assertEqual(reply["detail"], "Already answered.")
+        self.assertEqual(await StudentSolution.objects.filter(solved_quiz=self.quiz).acount(), 1)
+        self.assertEqual((await QuizStats.objects.aget(pk=self.quiz.id)).answered, 1)
+
+    async def test_only_students_answer(self):
+        other = await get_user_model().objects.acreate(username="other-teacher", is_teacher=True)
+        host = Connection(self.path, self.token(self.teacher))
+        teacher = Connection(self.path, self.token(other))
+        await teacher.receive("state")
+        await host.send(action="start")
+        await teacher.receive("state", status="running")
+
+        await teacher.send(action="answer", choice=self.choices[0][0].id)
+        self.assertEqual((await teacher.receive("error"))["detail"], "Only students can answer.")
+        await teacher.close()
+        await host.close()
+        self.assertFalse(await StudentSolution.objects.aexists())
+
+    async def test_invalid_messages(self):
+        host = Connection(self.path, self.token(self.teacher))
+        await host.receive("state")
+        for text in ("null", "[1]", '"start"', "{}", "not json"):
+            await host.inbox.put({"type": "websocket.receive", "text": text})
+            self.assertEqual((await host.receive("error"))["detail"], "Send a JSON object with an action.")
+        await host.close()
+
+    async def test_rejected_connections(self):
+        for path, token, code in (
+            (self.path, None, CLOSE_UNAUTHORIZED),
+            (self.path, "invalid", CLOSE_UNAUTHORIZED),
+            (f"/ws/live/{self.quiz.id + 1}/", self.token(self.teacher), CLOSE_NOT_FOUND),
+            ("/ws/other/", self.token(self.teacher), CLOSE_NOT_FOUND),
+        ):
+            connection = Connection(path, token)
+            self.assertEqual(await connection.event(), {"type": "websocket.close", "code": code})
+            await asyncio.wait_for(connection.task, 5)
@@ -0,0 +1,152 @@
+import os
+import re
+import shutil
+import tempfile
+import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
+from .. import metrics, throttling
+from ..models import Subject
+from ..roster import import_roster
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    # The test client's address
+    METRICS_ALLOWED_IPS=['127.0.0.1'],
+)
+class MetricsViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings = override_settings(METRICS_STORE_PATH=os.path.join(directory, "metrics.sqlite3"))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        metrics.registry.clear()
+
+        Subject.objects.create(name="Math")
+        self.user = get_user_model().objects.create_user(username="student", password="12345678", is_student=True)
+
+    def scrape(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        samples = {}
+        for line in response.content.decode().splitlines():
+            if not line.startswith("#"):
+                series, value = line.rsplit(" ", 1)
+                samples[series] = float(value)
+        return samples
+
+    def test_request_latency_queries_and_cache(self):
+        for _ in range(3):
+            self.client.get(reverse("subject-list"))
+
+        samples = self.scrape()
+        labels = 'url_name="subject-list",method="GET",status="200"'
+        self.assertEqual(samples[f"testskool_http_request_duration_seconds_count{{{labels}}}"], 3)
+        self.assertEqual(samples[f'testskool_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'], 3)
+        self.assertGreater(samples[f"testskool_http_request_duration_seconds_sum{{{labels}}}"], 0)
+        self.assertGreater(samples['testskool_db_queries_total{url_name="subject-list"}'], 0)
+        self.assertGreater(samples['testskool_cache_requests_total{result="hit"}'], 0)
+        self.assertGreater(samples['testskool_cache_requests_total{result="miss"}'], 0)
+
+    def test_buckets_are_cumulative_and_ordered(self):
+        metrics.password_hash_duration.observe(0.003, operation="test")
+        metrics.password_hash_duration.observe(0.3, operation="test")
+        body = self.client.get(reverse("metrics")).content.decode()
+
+        buckets = re.findall(r'testskool_password_hash_duration_seconds_bucket\{operation="test",le="([^"]+)"\} (\d+)', body)
+        self.assertEqual([le for le, count in buckets], [*(str(b) for b in metrics.HASH_BUCKETS), "+Inf"])
+        self.assertEqual([int(count) for le, count in buckets], [0, 1, 1, 1, 1, 1, 1, 2, 2, 2])
+        self.assertIn("# TYPE testskool_password_hash_duration_seconds histogram", body)
+
+    def test_password_hashing_time(self):
+        self.client.post(reverse("token_obtain_pair"), {"username": "student", "password": "12345678"})
+        self.user.set_password("87654321")
+        samples = self.scrape()
+        self.assertEqual(samples['testskool_password_hash_duration_seconds_count{operation="check"}'], 1)
+        self.assertEqual(samples['testskool_password_hash_duration_seconds_count{operation="set"}'], 1)
+
+    def test_password_checks_of_the_account_views(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.put(reverse("edit-profile"), {
+            "old_password": "12345678", "password": "87654321", "confirm_password": "87654321",
+        }, format="multipart")
+        response = self.client.delete(reverse("delete-account"), {"password": "87654321"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        list(import_roster([{"username": "grace", "password": "12345678"}], workers=1))
+
+        samples = self.scrape()
+        self.assertEqual(samples['testskool_password_hash_duration_seconds_count{operation="check"}'], 2)
+        # The new password and the roster's
+        self.assertEqual(samples['testskool_password_hash_duration_seconds_count{operation="set"}'], 2)
+
+    def test_upload_sizes(self):
+        self.client.force_authenticate(user=self.user)
+        upload = SimpleUploadedFile("picture.png", b"x" * 3000, content_type="image/png")
+        self.client.put(reverse("edit-profile"), {"profile_picture": upload}, format="multipart")
+
+        samples = self.scrape()
+        labels = 'view="edit-profile",field="profile_picture"'
+        self.assertEqual(samples[f"testskool_upload_size_bytes_sum{{{labels}}}"], 3000)
+        self.assertEqual(samples[f'testskool_upload_size_bytes_bucket{{{labels},le="1024"}}'], 0)
+        self.assertEqual(samples[f'testskool_upload_size_bytes_bucket{{{labels},le="4096"}}'], 1)
+
+    def test_throttle_rejections(self):
+        # Throttle rates are read once, into the throttle classes
+        throttling.throttle_store.reset()
+        with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"anon": "1/minute"}):
+            responses = [self.client.get(reverse("subject-list")).status_code for _ in range(3)]
+        self.assertEqual(responses, [200, 429, 429])
+        self.assertEqual(self.scrape()['testskool_throttled_requests_total{scope="anon"}'], 2)
+
+    def test_aggregated_across_processes(self):
+        self.client.get(reverse("subject-list"))
+        # Samples flushed by another worker process
+        metrics.metrics_store.add({("testskool_db_queries_total", 'url_name="subject-list"', ""): 5})
+        mine = metrics.registry.pending.copy()
+
+        samples = self.scrape()
+        own = mine[("testskool_db_queries_total", 'url_name="subject-list"', "")]
+        self.assertEqual(samples['testskool_db_queries_total{url_name="subject-list"}'], own + 5)
+
+    def test_flushed_in_the_background(self):
+        with override_settings(METRICS_FLUSH_INTERVAL=0.01):
+            metrics.cache_requests.inc(result="hit")
+            self.assertEqual(metrics.registry.flusher_pid, os.getpid())
+            # Cut the wait started with the default interval short
+            metrics.registry.wakeup.set()
+            deadline = time.monotonic() + 5
+            while metrics.registry.pending and time.monotonic() < deadline:
+                time.sleep(0.01)
+            with metrics.registry.flushing:
+                samples = metrics.metrics_store.samples()
+        self.assertEqual(samples, [("testskool_cache_requests_total", 'result="hit"', "", 1)])
+
+    def test_label_escaping(self):
+        metrics.throttled_requests.inc(scope='a"b\\c\nd')
+        self.assertIn('testskool_throttled_requests_total{scope="a\\"b\\\\c\\nd"} 1', self.client.get(reverse("metrics")).content.decode())
+
+    def test_internal_addresses_only(self):
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.7").status_code, 404)
+        with override_settings(METRICS_ALLOWED_IPS=["203.0.113.7"]):
+            self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.7").status_code, 200)
+
+    def test_disabled_without_addresses(self):
+        with override_settings(METRICS_ALLOWED_IPS=[]):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from ..images import make_thumbnails
+from ..serializers import UpdateProfileSerializer, MyProfileSerializer
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    MEDIA_ROOT=MEDIA_ROOT,
+    PROFILE_THUMBNAIL_ASYNC=False,
+)
+class ProfileThumbnailsTest(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="test-user", password="password", is_student=True)
+
+
+    # Helper function for creating images
+    def create_image(self, name="picture.jpeg", size=(400, 300), format="JPEG", mode="RGB"):
+        img = Image.new(mode, size, color="red")
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        buffer = BytesIO()
+        img.save(buffer, format=format, exif=exif) if format == "JPEG" else img.save(buffer, format=format)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{format.lower()}")
+
+
+    def upload(self, image):
+        serializer = UpdateProfileSerializer(instance=self.user, data={"profile_picture": image}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        self.user.refresh_from_db()
+
+
+    def test_thumbnails_made_after_upload(self):
+        self.upload(self.create_image())
+
+        self.assertEqual(sorted(self.user.profile_thumbnails, key=int), ["64", "128", "256"])
+        for size, formats in self.user.profile_thumbnails.items():
+            self.assertEqual(sorted(formats), ["jpeg", "webp"])
+            for extension, name in formats.items():
+                with default_storage.open(name) as f, Image.open(f) as thumbnail:
+                    self.assertEqual(thumbnail.size, (int(size), int(size)))
+                    self.assertEqual(thumbnail.format, extension.upper())
+                    self.assertEqual(len(thumbnail.getexif()), 0)
+
+
+    def test_transparent_png(self):
+        self.upload(self.create_image("picture.png", format="PNG", mode="RGBA"))
+        self.assertIn("jpeg", self.user.profile_thumbnails["64"])
+
+
+    def test_thumbnails_in_profile_payload(self):
+        self.upload(self.create_image())
+        data = MyProfileSerializer(instance=self.user).data
+        self.assertEqual(data["profile_thumbnails"], self.user.profile_thumbnails)
+
+
+    def test_replacement_removes_old_thumbnails(self):
+        self.upload(self.create_image("first.jpeg"))
+        old = self.user.profile_thumbnails["64"]["webp"]
+
+        self.upload(self.create_image("second.jpeg", size=(200, 200)))
+
+        self.assertFalse(default_storage.exists(old))
+        self.assertNotEqual(self.user.profile_thumbnails["64"]["webp"], old)
+
+
+    def test_broken_image_is_skipped(self):
+        self.user.profile_picture = SimpleUploadedFile("broken.jpeg", b"not an image")
+        self.user.save()
+        with self.assertLogs("testskool.images", "WARNING"):
+            self.assertIsNone(make_thumbnails(self.user.pk))
+
+
+    def test_make_thumbnails_command(self):
+        self.user.profile_picture = self.create_image()
+        self.user.save()
+        out = StringIO()
+
+        call_command("make_thumbnails", stdout=out)
+
+        self.user.refresh_from_db()
+        self.assertIn("Made thumbnails for 1 user(s), 0 failed.", out.getvalue())
+        self.assertIn("128", self.user.profile_thumbnails)
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from asgiref.sync import iscoroutinefunction
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from ..models import Subject
+from ..profiling import PROFILE_NAME_RE, SamplingProfilerMiddleware
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class SamplingProfilerTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Subject.objects.create(name="Math")
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def profiles(self):
+        return sorted(PROFILE_NAME_RE.match(name)["url_name"] for name in os.listdir(self.directory))
+
+    def test_disabled_by_default(self):
+        with override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_DIR=self.directory):
+            self.client.get(reverse("subject-list"))
+        self.assertEqual(self.profiles(), [])
+
+    def test_samples_one_in_n_per_url_name(self):
+        with override_settings(PROFILING_SAMPLE_RATE=3, PROFILING_DIR=self.directory):
+            for _ in range(4):
+                self.assertEqual(self.client.get(reverse("subject-list")).status_code, 200)
+            self.client.get(reverse("search"), {"q": "math"})
+            self.client.get("/not-a-page/")
+
+        # Every URL name has its own counter, starting with a sampled request
+        self.assertEqual(self.profiles(), ["search", "subject-list", "subject-list", "unresolved"])
+
+    async def test_async_views_stay_async(self):
+        async def get_response(request):
+            return None
+
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory):
+            self.assertTrue(iscoroutinefunction(SamplingProfilerMiddleware(get_response)))
+            response = await self.async_client.get(reverse("async-subject-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.profiles(), ["async-subject-list"])
+
+    def test_rotation(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory, PROFILING_MAX_FILES=2):
+            for _ in range(5):
+                self.client.get(reverse("subject-list"))
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_aggregate_profiles(self):
+        with override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_DIR=self.directory):
+            for _ in range(3):
+                self.client.get(reverse("subject-list"))
+            self.client.get(reverse("search"), {"q": "math"})
+
+        out = StringIO()
+        call_command("aggregate_profiles", "--dir", self.directory, "--limit", "5", stdout=out)
+        report = out.getvalue()
+        self.assertIn("subject-list: 3 profile(s)", report)
+        self.assertIn("search: 1 profile(s)", report)
+        self.assertLess(report.index("subject-list"), report.index("search:"))
+        self.assertIn("cumulative time", report)
+
+        out = StringIO()
+        call_command("aggregate_profiles", "--dir", self.directory, "--url-name", "search", stdout=out)
+        self.assertNotIn("subject-list", out.getvalue())
+
+    def test_aggregate_profiles_missing_directory(self):
+        with self.assertRaises(CommandError):
+            call_command("aggregate_profiles", "--dir", os.path.join(self.directory, "missing"), stdout=StringIO())
@@ -0,0 +1,48 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db.models import aprefetch_related_objects
+from django.test import TestCase, override_settings
+from ..models import Subject
+from ..projections import profile_data, subject_list
+from ..serializers import MyProfileSerializer, Subjects
+
+
+class ProjectionsTest(TestCase):
+    def setUp(self):
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        User = get_user_model()
+        self.teacher = User.objects.create_user(
+            username="teacher", password="12345678", is_teacher=True, first_name="Ada", last_name="Çelik",
+            about="About me", profile_picture="profile-pictures/ada.png",
+            profile_thumbnails={"64": {"webp": "profile-pictures/thumbnails/1-abc-64.webp"}},
+        )
+        self.teacher.subject.set([self.art, self.math])
+        self.student = User.objects.create_user(username="student", password="12345678", is_student=True)
+
+    def test_subject_list_parity(self):
+        queryset = Subject.objects.order_by("name")
+
+        self.assertEqual(subject_list(queryset), Subjects(queryset, many=True).data)
+
+    def test_profile_parity(self):
+        for user in (self.teacher, self.student):
+            user = get_user_model().objects.get(pk=user.pk)
+            with self.subTest(user=user.username):
+                self.assertEqual(profile_data(user), MyProfileSerializer(user).data)
+                self.assertEqual(list(profile_data(user)), list(MyProfileSerializer(user).data))
+
+    @override_settings(TIME_ZONE="Europe/Istanbul", REST_FRAMEWORK={"DATETIME_FORMAT": "%Y-%m-%d %H:%M"})
+    def test_profile_parity_datetime_settings(self):
+        user = get_user_model().objects.get(pk=self.teacher.pk)
+
+        self.assertEqual(profile_data(user)["date_joined"], MyProfileSerializer(user).data["date_joined"])
+
+    def test_profile_with_prefetched_subjects(self):
+        user = get_user_model().objects.get(pk=self.teacher.pk)
+        async_to_sync(aprefetch_related_objects)([user], "subject")
+
+        with self.assertNumQueries(0):
+            data = profile_data(user)
+
+        self.assertEqual(data, MyProfileSerializer(user).data)
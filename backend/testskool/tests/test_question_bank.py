@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Answer, Choice, Question, Quiz, Subject
+
+
+def bank_line(**fields):
+    row = {
+        "quiz": "Fractions", "subject": "Math", "type": "test", "question": "1/2 + 1/4 = ?",
+        "choices": {"A": "3/4", "B": "2/6"}, "answer": "A",
+    }
+    row.update(fields)
+    return json.dumps(row) + "\n"
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    QUESTION_BANK_BATCH_SIZE=2,
+)
+class QuestionBankTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.import_url = reverse("question-bank-import")
+        self.export_url = reverse("question-bank-export")
+        Subject.objects.create(name="Math")
+        Subject.objects.create(name="Art")
+        self.teacher = get_user_model().objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.student = get_user_model().objects.create_user(username="student", password="12345678", is_student=True)
+
+    def upload(self, content):
+        return SimpleUploadedFile("bank.jsonl", content.encode(), content_type="application/x-ndjson")
+
+    def test_import(self):
+        content = "".join([
+            bank_line(),
+            bank_line(question="1/3 + 1/3 = ?", choices=[{"choice": "A", "text": "2/3"}, {"choice": "B", "text": "2/6"}]),
+            bank_line(quiz="Colors", subject="Art", question="Red + blue = ?", choices={"A": "Green", "B": "Purple"}, answer="B"),
+            bank_line(subject="Unknown"),
+            bank_line(answer="C"),
+            "not json\n",
+        ])
+        self.client.force_authenticate(self.teacher)
+
+        response = self.client.post(self.import_url, {"bank": self.upload(content)}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(response.data["failed"], 3)
+        self.assertEqual([entry["row"] for entry in response.data["errors"]], [4, 5, 6])
+        self.assertIn("subject", response.data["errors"][0]["errors"])
+        self.assertIn("answer", response.data["errors"][1]["errors"])
+
+        fractions = Quiz.objects.get(title="Fractions")
+        self.assertEqual(fractions.quiz_owner, self.teacher)
+        self.assertEqual(fractions.questions.count(), 2)
+        self.assertEqual(Quiz.objects.count(), 2)
+        self.assertEqual(Choice.objects.count(), 6)
+        colors = Question.objects.get(question="Red + blue = ?")
+        self.assertEqual(colors.answer.answer.text, "Purple")
+
+    def test_import_reuses_quizzes(self):
+        quiz = Quiz.objects.create(quiz_owner=self.teacher, subject=Subject.objects.get(name="Math"), type="test", title="Fractions")
+        self.client.force_authenticate(self.teacher)
+
+        self.client.post(self.import_url, {"bank": self.upload(bank_line() * 3)}, format="multipart")
+
+        self.assertEqual(Quiz.objects.count(), 1)
+        self.assertEqual(quiz.questions.count(), 3)
+
+    def test_import_only_for_teachers(self):
+        self.client.force_authenticate(self.student)
+
+        response = self.client.post(self.import_url, {"bank": self.upload(bank_line())}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Question.objects.exists())
+
+    def test_import_without_file(self):
+        self.client.force_authenticate(self.teacher)
+
+        response = self.client.post(self.import_url, {}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_round_trip(self):
+        content = bank_line() + bank_line(quiz="Colors", subject="Art", choices={"B": "Purple", "A": "Green"}, answer="B")
+        self.client.force_authenticate(self.teacher)
+        self.client.post(self.import_url, {"bank": self.upload(content)}, format="multipart")
+
+        response = self.client.get(self.export_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [json.loads(line) for line in content.splitlines()])
+
+    def test_export_accept_ndjson(self):
+        self.client.force_authenticate(self.teacher)
+        self.client.post(self.import_url, {"bank": self.upload(bank_line())}, format="multipart")
+
+        response = self.client.get(self.export_url, HTTP_ACCEPT="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 1)
+        # Errors stay JSON
+        response = self.client.get(self.export_url, {"quiz": "x"}, HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"quiz": ["A valid integer is required."]})
+
+    def test_export_only_own_questions(self):
+        other = get_user_model().objects.create_user(username="other", password="12345678", is_teacher=True)
+        quiz = Quiz.objects.create(quiz_owner=other, subject=Subject.objects.get(name="Math"), type="test", title="Other")
+        question = Question.objects.create(quiz=quiz, question="?")
+        Answer.objects.create(question=question, answer=Choice.objects.create(question=question, choice="A", text="A"))
+        self.client.force_authenticate(self.teacher)
+
+        response = self.client.get(self.export_url)
+
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_commands(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "bank.jsonl")
+        with open(path, "w") as f:
+            f.write(bank_line() + bank_line(answer=None))
+        out = StringIO()
+
+        call_command("import_question_bank", path, owner="teacher", stdout=out, stderr=StringIO())
+        self.assertIn("Imported 1 question(s), 1 row(s) failed.", out.getvalue())
+
+        out = StringIO()
+        call_command("export_question_bank", owner="teacher", stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), json.loads(bank_line()))
+        os.remove(path)
+        os.rmdir(directory)
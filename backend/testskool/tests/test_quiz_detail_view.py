@@ -0,0 +1,149 @@
+import gzip
+import json
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Answer, Choice, Question, Quiz, Subject
+from ..quiz_payload import QUIZ_LOCK_KEY, QUIZ_PAYLOAD_KEY, get_quiz_payload, get_quiz_version
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    }
+)
+class QuizDetailViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        teacher = get_user_model().objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.student = get_user_model().objects.create_user(username="student", password="12345678", is_student=True)
+        subject = Subject.objects.create(name="Math")
+        self.quiz = Quiz.objects.create(quiz_owner=teacher, subject=subject, type="test", title="Quiz")
+        self.question = Question.objects.create(quiz=self.quiz, question="1 + 1 = ?")
+        self.choices = [
+            Choice.objects.create(question=self.question, choice=letter, text=text)
+            for letter, text in (("B", "2"), ("A", "1"))
+        ]
+        Answer.objects.create(question=self.question, answer=self.choices[0])
+        self.url = reverse("quiz-detail", kwargs={"pk": self.quiz.id})
+        self.client.force_authenticate(self.student)
+
+    def test_quiz_payload(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], "Quiz")
+        self.assertEqual(response.json()["questions"], [{
+            "id": self.question.id,
+            "question": "1 + 1 = ?",
+            "choices": [
+                {"id": self.choices[1].id, "choice": "A", "text": "1"},
+                {"id": self.choices[0].id, "choice": "B", "text": "2"},
+            ],
+        }])
+        self.assertNotIn("answer", response.content.decode())
+
+    def test_payload_is_cached(self):
+        self.client.get(self.url)
+
+        # The version lookup only
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), plain.json())
+        self.assertNotEqual(response["ETag"], plain["ETag"])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_invalidated_on_changes(self):
+        etags = [self.client.get(self.url)["ETag"]]
+
+        self.question.question = "2 + 2 = ?"
+        self.question.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["questions"][0]["question"], "2 + 2 = ?")
+        etags.append(response["ETag"])
+
+        self.choices[1].delete()
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()["questions"][0]["choices"]), 1)
+        etags.append(response["ETag"])
+
+        self.quiz.title = "Renamed"
+        self.quiz.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["title"], "Renamed")
+        etags.append(response["ETag"])
+
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_changes_made_by_other_processes(self):
+        self.client.get(self.url)
+
+        # Another worker's edit, its signals ran in that process with its own cache
+        Question.objects.filter(pk=self.question.pk).update(question="2 + 2 = ?")
+        Quiz.objects.filter(pk=self.quiz.pk).update(version=F("version") + 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()["questions"][0]["question"], "2 + 2 = ?")
+
+    def test_quiz_delete_without_a_query_per_row(self):
+        for number in range(10):
+            question = Question.objects.create(quiz=self.quiz, question=f"Question {number}")
+            Choice.objects.bulk_create(Choice(question=question, choice=letter, text=letter) for letter in "ABCD")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.quiz.delete()
+
+        self.assertFalse(Quiz.objects.exists())
+        # No new version for the questions and choices deleted with it
+        self.assertFalse(any('UPDATE "testskool_quiz"' in query["sql"] for query in queries))
+
+    def test_missing_quiz(self):
+        response = self.client.get(reverse("quiz-detail", kwargs={"pk": self.quiz.id + 1}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unauthenticated(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_waits_for_payload_being_rendered(self):
+        version = get_quiz_version(self.quiz.id)
+        key = QUIZ_PAYLOAD_KEY.format(quiz_id=self.quiz.id, version=version)
+        cache.add(QUIZ_LOCK_KEY.format(quiz_id=self.quiz.id, version=version), True)
+        rendered = {"body": b"{}"}
+
+        # The request holding the lock finishes while this one waits
+        with mock.patch("testskool.quiz_payload.time.sleep", side_effect=lambda seconds: cache.set(key, rendered)):
+            with self.assertNumQueries(1):
+                payload = get_quiz_payload(self.quiz.id)
+
+        self.assertEqual(payload, rendered)
@@ -0,0 +1,109 @@
+import base64
+import json
+from urllib.parse import urlencode
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Subject, Quiz
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    }
+)
+class QuizListViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("quiz-list")
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        self.teacher1 = get_user_model().objects.create_user(username="teacher1", password="12345678", is_teacher=True)
+        self.teacher2 = get_user_model().objects.create_user(username="teacher2", password="12345678", is_teacher=True)
+
+        now = timezone.now()
+        self.quizzes = [
+            Quiz.objects.create(
+                quiz_owner=self.teacher1 if i % 2 else self.teacher2,
+                subject=self.math if i % 3 else self.art,
+                type="test" if i % 4 else "classic",
+                title=f"Quiz {i}",
+                date=now - timedelta(minutes=i // 2),  # Pairs share a date
+            )
+            for i in range(25)
+        ]
+
+
+    def test_newest_first_with_cursor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertIsNone(response.data["previous"])
+        self.assertIn("cursor=", response.data["next"])
+
+        second = self.client.get(response.data["next"])
+        self.assertIsNone(second.data["next"])
+
+        ids = [quiz["id"] for quiz in response.data["results"] + second.data["results"]]
+        expected = [quiz.id for quiz in sorted(self.quizzes, key=lambda quiz: (quiz.date, quiz.id), reverse=True)]
+        self.assertEqual(ids, expected)
+
+
+    def test_cursor_values_of_the_wrong_type(self):
+        positions = (["abc", 1], ["2026-01-01T00:00:00", 1], ["2026-01-01T00:00:00+00:00", "x"], [{"a": 1}, 1], [None, None],
+                     ["2026-01-01T00:00:00+00:00", 10 ** 30])
+        for position in positions:
+            cursor = base64.b64encode(urlencode({"p": json.dumps(position)}).encode()).decode()
+            with self.subTest(position=position):
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_quiz_card_payload(self):
+        # Quiz 0 and 1 share the newest date, the higher id comes first
+        quiz = self.client.get(self.url, {"page_size": 1}).data["results"][0]
+        self.assertEqual(quiz["title"], "Quiz 1")
+        self.assertEqual(quiz["subject"], {"id": self.math.id, "name": "Math"})
+        self.assertEqual(quiz["quiz_owner"]["username"], "teacher1")
+        self.assertEqual(set(quiz), {"id", "title", "type", "about", "cover_image", "subject", "quiz_owner", "date"})
+
+
+    def test_filters(self):
+        response = self.client.get(self.url, {"subject": self.art.id, "owner": self.teacher1.id, "type": "test", "page_size": 100})
+        expected = {
+            quiz.id for quiz in self.quizzes
+            if quiz.subject == self.art and quiz.quiz_owner == self.teacher1 and quiz.type == "test"
+        }
+        self.assertEqual({quiz["id"] for quiz in response.data["results"]}, expected)
+
+
+    def test_invalid_filter_returns_400(self):
+        response = self.client.get(self.url, {"subject": "math"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_fixed_query_count_per_page(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(response.data["next"])
+
+
+    def test_filtered_browse_uses_composite_indexes(self):
+        plan = Quiz.objects.filter(subject=self.math).order_by("-date", "-id").explain()
+        self.assertIn("quiz_subject_date_idx", plan)
+        plan = Quiz.objects.filter(quiz_owner=self.teacher1).order_by("-date", "-id").explain()
+        self.assertIn("quiz_owner_date_idx", plan)
+
+
+    def test_str_method(self):
+        self.assertEqual(str(self.quizzes[0]), "Quiz: Quiz 0")
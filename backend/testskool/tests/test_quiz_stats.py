@@ -0,0 +1,149 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..grading import grade_quiz
+from ..models import Answer, Choice, Question, Quiz, QuizResult, QuizStats, StudentSolution, Subject
+from ..stats import rebuild_quiz_stats
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class QuizStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.teacher = User.objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.students = [
+            User.objects.create_user(username=f"student{i}", password="12345678", is_student=True)
+            for i in range(3)
+        ]
+        subject = Subject.objects.create(name="Math")
+        self.quiz = Quiz.objects.create(quiz_owner=self.teacher, subject=subject, type="test", title="Quiz")
+        self.url = reverse("quiz-stats", kwargs={"pk": self.quiz.id})
+
+        self.questions = []
+        for i in range(4):
+            question = Question.objects.create(quiz=self.quiz, question=f"Question {i}")
+            choices = [Choice.objects.create(question=question, choice=letter, text=letter) for letter in "AB"]
+            Answer.objects.create(question=question, answer=choices[0])
+            self.questions.append(choices)
+
+    def solve(self, student, picks, questions=None):
+        for choices, pick in zip(self.questions[:questions], picks):
+            StudentSolution.objects.create(
+                student=student, solved_quiz=self.quiz, solved_question=choices[0].question,
+                student_answer=choices[pick] if pick is not None else None,
+            )
+
+    def assertStatsEqualRebuild(self):
+        stats = QuizStats.objects.get(pk=self.quiz.id)
+        results = sorted(QuizResult.objects.filter(quiz=self.quiz).values_list("student_id", "correct", "answered", "graded"))
+        rebuilt = rebuild_quiz_stats(self.quiz.id)
+        fields = ["question_count", "students", "completed", "correct", "answered", "graded", "histogram", "questions"]
+        self.assertEqual(
+            {field: getattr(stats, field) for field in fields},
+            {field: getattr(rebuilt, field) for field in fields},
+        )
+        self.assertEqual(
+            results,
+            sorted(QuizResult.objects.filter(quiz=self.quiz).values_list("student_id", "correct", "answered", "graded")),
+        )
+        return stats
+
+    def test_stats_updated_while_grading(self):
+        self.solve(self.students[0], [0, 0, 0, 0])
+        self.solve(self.students[1], [0, 1, None, 1])
+        grade_quiz(self.quiz.id)
+
+        stats = QuizStats.objects.get(pk=self.quiz.id)
+        self.assertEqual(stats.students, 2)
+        self.assertEqual(stats.completed, 2)
+        self.assertEqual(stats.correct, 5)
+        self.assertEqual(stats.answered, 7)
+        self.assertEqual(stats.graded, 8)
+        self.assertEqual(stats.histogram, [0, 0, 1, 0, 0, 0, 0, 0, 0, 1])
+        self.assertEqual(
+            stats.questions[str(self.questions[1][0].question_id)],
+            {"correct": 1, "answered": 2, "graded": 2},
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        # Partial submission first, completed later, in small batches
+        self.solve(self.students[0], [0, 1], questions=2)
+        self.solve(self.students[1], [1, 1, 1, 1])
+        grade_quiz(self.quiz.id, batch_size=3)
+
+        StudentSolution.objects.create(
+            student=self.students[0], solved_quiz=self.quiz,
+            solved_question=self.questions[2][0].question, student_answer=self.questions[2][0],
+        )
+        self.solve(self.students[2], [0, 0, 1, None])
+        grade_quiz(self.quiz.id, batch_size=2)
+
+        stats = self.assertStatsEqualRebuild()
+        self.assertEqual(stats.students, 3)
+        self.assertEqual(stats.completed, 2)
+
+    def test_question_added_rebuilds(self):
+        self.solve(self.students[0], [0, 0, 0, 0])
+        grade_quiz(self.quiz.id)
+        Question.objects.create(quiz=self.quiz, question="Question 4")
+        self.solve(self.students[1], [0, 0, 0, 0])
+        grade_quiz(self.quiz.id)
+
+        stats = self.assertStatsEqualRebuild()
+        self.assertEqual(stats.question_count, 5)
+        self.assertEqual(stats.completed, 0)
+
+    def test_command(self):
+        self.solve(self.students[0], [0, 0, 0, 0])
+        grade_quiz(self.quiz.id)
+        QuizStats.objects.filter(pk=self.quiz.id).update(correct=0, histogram=[])
+        out = StringIO()
+
+        call_command("rebuild_quiz_stats", stdout=out)
+
+        self.assertEqual(QuizStats.objects.get(pk=self.quiz.id).correct, 4)
+        self.assertIn("Rebuilt the statistics of 1 quiz(zes).", out.getvalue())
+
+    def test_stats_view(self):
+        self.solve(self.students[0], [0, 0, 1, 1])
+        grade_quiz(self.quiz.id)
+        self.client.force_authenticate(self.teacher)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["average_score"], 2)
+        self.assertEqual(response.data["correct_rate"], 0.5)
+        self.assertEqual(
+            response.data["questions"][str(self.questions[0][0].question_id)]["correct_rate"], 1
+        )
+
+    def test_stats_view_only_for_owner(self):
+        self.solve(self.students[0], [0, 0, 0, 0])
+        grade_quiz(self.quiz.id)
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_view_unauthenticated(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
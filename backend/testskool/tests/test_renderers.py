@@ -0,0 +1,61 @@
+import io
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest import mock
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+from .. import renderers
+from ..renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    data = {
+        "name": "Çağrı ☃",
+        "date": datetime(2026, 10, 18, 12, 30, 1, 250, tzinfo=timezone.utc),
+        "local": datetime(2026, 10, 18, 12, 30, tzinfo=timezone(timedelta(hours=3))),
+        "naive": datetime(2026, 10, 18, 12, 30),
+        "price": Decimal("1.50"),
+        "label": gettext_lazy("Subject"),
+        "nested": ReturnDict({"list": [1, 2.5, None, True]}, serializer=None),
+        1: "integer key",
+    }
+
+    def test_same_output_as_drf(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_indent_falls_back(self):
+        rendered = FastJSONRenderer().render(self.data, "application/json; indent=4")
+
+        self.assertEqual(rendered, JSONRenderer().render(self.data, "application/json; indent=4"))
+
+    def test_big_integers_fall_back(self):
+        self.assertEqual(FastJSONRenderer().render({"big": 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def parse(self, content, parser=None, encoding="utf-8"):
+        return (parser or FastJSONParser()).parse(io.BytesIO(content), parser_context={"encoding": encoding})
+
+    def test_same_result_as_drf(self):
+        content = '{"name": "Çağrı", "subject": [1, 2], "about": null, "x": 1.5}'.encode()
+
+        self.assertEqual(self.parse(content), self.parse(content, JSONParser()))
+
+    def test_invalid(self):
+        for content in (b"{", b'{"x": NaN}', "{}".encode("utf-16")):
+            with self.assertRaises(ParseError):
+                self.parse(content)
+
+    def test_other_encodings_fall_back(self):
+        self.assertEqual(self.parse('{"name": "Ça"}'.encode("latin-1"), encoding="latin-1"), {"name": "Ça"})
@@ -0,0 +1,112 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Quiz, Subject
+from ..roster import import_roster
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class SearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("search")
+        User = get_user_model()
+        self.math = Subject.objects.create(name="Mathematics")
+        self.teacher = User.objects.create_user(
+            username="ada", password="12345678", is_teacher=True, first_name="Ada", last_name="Lovelace",
+            email="ada@example.com", about="Loves mathematics and engines",
+        )
+        self.student = User.objects.create_user(
+            username="student", password="12345678", is_student=True, first_name="Ada", last_name="Student",
+        )
+        self.quiz = Quiz.objects.create(
+            quiz_owner=self.teacher, subject=self.math, type="test", title="Mathematics basics",
+            about="Fractions and decimals",
+        )
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(result["kind"], result["id"]) for result in response.data["results"]]
+
+    def test_search_ranks_titles_first(self):
+        results = self.search("mathem")
+
+        self.assertEqual(set(results), {("subject", self.math.id), ("quiz", self.quiz.id), ("teacher", self.teacher.id)})
+        self.assertEqual(results[-1], ("teacher", self.teacher.id))
+
+    def test_search_every_word(self):
+        self.assertEqual(self.search("fractions math"), [("quiz", self.quiz.id)])
+
+    def test_limit(self):
+        self.assertEqual(len(self.search("mathem", limit=1)), 1)
+        self.assertEqual(self.search("mathem", limit=0), [])
+
+    def test_search_by_kind(self):
+        self.assertEqual(self.search("mathematics", kind="quiz"), [("quiz", self.quiz.id)])
+
+    def test_students_and_private_fields_not_public(self):
+        self.assertEqual(self.search("ada"), [("teacher", self.teacher.id)])
+        self.assertEqual(self.search("example.com"), [])
+
+    def test_index_follows_changes(self):
+        self.quiz.title = "Geometry"
+        self.quiz.save()
+        self.teacher.delete()
+
+        self.assertEqual(self.search("geometry"), [])
+        self.assertEqual(self.search("lovelace"), [])
+
+    def test_index_follows_quiz_changes(self):
+        self.quiz.title = "Geometry"
+        self.quiz.save()
+
+        self.assertEqual(self.search("geometry"), [("quiz", self.quiz.id)])
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('"math* OR NEAR(ada'), [])
+        self.assertEqual(self.search("***"), [])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {"q": "a", "kind": "student"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"q": "a", "limit": "x"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_roster_import_is_indexed(self):
+        list(import_roster([{"username": "grace", "password": "12345678", "is_teacher": "teacher",
+                             "subject": "Mathematics", "first_name": "Grace"}], workers=1))
+
+        self.assertEqual(self.search("grace"), [("teacher", get_user_model().objects.get(username="grace").id)])
+
+    def test_admin_search(self):
+        admin = get_user_model().objects.create_superuser(username="admin", password="12345678", email="admin@example.com")
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:testskool_user_changelist"), {"q": "ada@example"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.context["cl"].result_list), [self.teacher])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM testskool_search")
+        out = StringIO()
+
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertEqual(len(self.search("mathematics")), 3)
+        self.assertIn("Rebuilt the search index.", out.getvalue())
@@ -0,0 +1,91 @@
+import json
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from ..models import Subject
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class ServerTimingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Subject.objects.create(name="Math")
+        self.user = get_user_model().objects.create_user(username="student", password="12345678", is_student=True)
+
+    def timing(self, response):
+        return {
+            metric.split(";")[0]: metric
+            for metric in (part.strip() for part in response["Server-Timing"].split(","))
+        }
+
+    def test_server_timing_header(self):
+        url = reverse("subject-list")
+        first = self.timing(self.client.get(url))
+        second = self.timing(self.client.get(url))
+
+        self.assertRegex(first["db"], r'^db;dur=\d+\.\d\d;desc="[1-9]\d* queries"$')
+        # The catalog version only
+        self.assertIn('desc="1 queries"', second["db"])
+        self.assertRegex(second["cache"], r'desc="hits=[1-9]\d* misses=0"')
+        self.assertRegex(first["cache"], r'desc="hits=\d+ misses=[1-9]\d*"')
+        self.assertRegex(second["total"], r"^total;dur=\d+\.\d\d$")
+        self.assertRegex(first["view"], r"^view;dur=\d+\.\d\d$")
+        self.assertLessEqual(*[float(first[name].split("dur=")[1]) for name in ("view", "total")])
+
+    def test_log_line(self):
+        self.client.force_authenticate(self.user)
+
+        with self.assertLogs("testskool.requests", "INFO") as logs:
+            self.client.get(reverse("my-profile"))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["url_name"], "my-profile")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], 1)
+        self.assertNotIn("slow_queries", line)
+
+    def test_streaming_response_reported_when_sent(self):
+        teacher = get_user_model().objects.create_user(username="teacher", password="12345678", is_teacher=True)
+        self.client.force_authenticate(teacher)
+
+        with self.assertLogs("testskool.requests", "INFO") as logs:
+            response = self.client.get(reverse("gradebook-export"))
+            self.assertEqual(logs.records, [])
+            b"".join(response.streaming_content)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["url_name"], "gradebook-export")
+        # The solutions are queried while the CSV is sent
+        self.assertGreaterEqual(line["queries"], 1)
+        self.assertGreater(line["view_ms"], 0)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_report(self):
+        with self.assertLogs("testskool.requests", "WARNING") as logs:
+            self.client.get(reverse("subject-list"))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertTrue(line["slow_queries"])
+        self.assertTrue(any("testskool_subject" in query["sql"] for query in line["slow_queries"]))
+
+    async def test_async_views_are_measured(self):
+        response = await self.async_client.get(reverse("async-subject-list"))
+
+        self.assertRegex(response["Server-Timing"], r'db;dur=\d+\.\d\d;desc="[1-9]\d* queries"')
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_can_be_disabled(self):
+        response = self.client.get(reverse("subject-list"))
+
+        self.assertNotIn("Server-Timing", response)
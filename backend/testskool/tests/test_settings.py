@@ -73,4 +73,6 @@ class SettingsTest(TestCase):
         self.assertEqual(simple_jwt['REFRESH_TOKEN_LIFETIME'], timedelta(days=30))
 
 
-
+    def test_metrics_disabled_by_default(self):
+        """Test that /metrics is only served to configured addresses"""
+        self.assertEqual(settings.METRICS_ALLOWED_IPS, [])
@@ -0,0 +1,38 @@
+import os
+import tempfile
+from django.conf import settings
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase
+
+
+class SQLiteProductionProfileTest(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.connection = DatabaseWrapper({
+            **settings.DATABASES['default'],
+            'NAME': os.path.join(self.dir.name, 'db.sqlite3'),
+            'OPTIONS': settings.SQLITE_PRODUCTION_OPTIONS,
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+        }, alias='sqlite-production-test')
+        self.addCleanup(self.connection.close)
+
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('cache_size'), -20000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+
+
+    def test_transactions_begin_immediate(self):
+        self.connection.ensure_connection()
+        self.assertEqual(self.connection.transaction_mode, 'IMMEDIATE')
@@ -0,0 +1,109 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from rest_framework import status
+from ..models import CacheVersion, Subject
+from django.test import override_settings
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from ..catalog import CATALOG_VERSION, get_catalog_version
+
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK = {
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    }
+)
+class SubjectCatalogTest(APITestCase):
+    # Cached subject catalog and conditional requests
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("subject-list")
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+
+
+    def test_response_has_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+
+    def test_prerendered_body(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json(), [
+            {"id": self.art.id, "name": "Art"},
+            {"id": self.math.id, "name": "Math"},
+        ])
+
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+    def test_cached_catalog_reads_the_version_only(self):
+        self.client.get(self.url)
+        # One version lookup for the validators and the body
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 2)
+
+
+    def test_subject_save_invalidates_catalog(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.math.name = "Mathematics"
+        self.math.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data[1]["name"], "Mathematics")
+
+
+    def test_subject_delete_invalidates_catalog(self):
+        self.client.get(self.url)
+        self.art.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual([subject["name"] for subject in response.data], ["Math"])
+
+
+    def test_changes_made_by_other_processes(self):
+        self.client.get(self.url)
+
+        # Another worker's edit, its signals ran in that process with its own cache
+        Subject.objects.filter(pk=self.art.pk).update(name="Music")
+        CacheVersion.objects.filter(name=CATALOG_VERSION).update(version=F("version") + 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual([subject["name"] for subject in response.data], ["Math", "Music"])
+
+
+    def test_teacher_change_bumps_version(self):
+        teacher = get_user_model().objects.create_user(username="teacher", password="12345678")
+        etag = self.client.get(self.url)["ETag"]
+        version = get_catalog_version()
+
+        self.math.teachers.add(teacher)
+
+        # Cached entry is rebuilt, the payload (and so the ETag) stays the same
+        self.assertNotEqual(get_catalog_version(), version)
+        self.assertEqual(self.client.get(self.url)["ETag"], etag)
@@ -93,4 +93,24 @@ class SubjectModelTest(APITestCase):
         """Test the string representation of the Subject model."""
         self.assertEqual(str(self.math), 'Subject: Math')
         self.assertEqual(str(self.art), 'Subject: Art')
-        self.assertEqual(str(self.history), 'Subject: History')
\ No newline at end of file
+        self.assertEqual(str(self.history), 'Subject: History')
+
+    def test_teacher_relation_is_shared(self):
+        """Test that User.subject and Subject.teachers are the same relation."""
+        self.teacher1.subject.add(self.math)
+        self.art.teachers.add(self.teacher1)
+
+        self.assertEqual(list(self.math.teachers.all()), [self.teacher1])
+        self.assertEqual(set(self.teacher1.subject.all()), {self.math, self.art})
+        self.assertEqual(set(self.teacher1.subjects_set.all()), {self.math, self.art})
+
+
+    def test_teachers_of_subject_query(self):
+        """Test teacher lookup by subject through the single join table."""
+        self.teacher1.subject.add(self.math)
+        self.teacher2.subject.add(self.math, self.history)
+
+        with self.assertNumQueries(1):
+            teachers = list(get_user_model().objects.filter(subject=self.math).order_by('username'))
+        self.assertEqual(teachers, [self.teacher1, self.teacher2])
+        self.assertEqual(list(Subject.objects.filter(teachers=self.teacher2).order_by('name')), [self.history, self.math])
@@ -0,0 +1,115 @@
+import base64
+import json
+from urllib.parse import urlencode
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models import Subject
+
+
+# Override throttling settings to not throttle for test cases
+@override_settings(
+    REST_FRAMEWORK={
+        'DEFAULT_THROTTLE_RATES': {
+            'anon': '1/minute',
+            'user': '1/minute',
+        }
+    },
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class TeacherListViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("teacher-list")
+        self.math = Subject.objects.create(name="Math")
+        self.art = Subject.objects.create(name="Art")
+        User = get_user_model()
+        self.teachers = []
+        for i in range(7):
+            teacher = User.objects.create_user(
+                username=f"teacher{i}", password="12345678", is_teacher=True,
+                first_name=f"First {i}", last_name="Same" if i < 3 else f"Last {i}",
+            )
+            teacher.subject.set([self.math, self.art] if i % 2 else [self.math])
+            self.teachers.append(teacher)
+        User.objects.create_user(username="student", password="12345678", is_student=True)
+
+    def collect(self, params):
+        """ Follow the cursor through every page """
+        usernames, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            usernames += [teacher["username"] for teacher in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+        return usernames, pages
+
+    def test_teachers_by_name(self):
+        usernames, pages = self.collect({"page_size": 2})
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(usernames, [f"teacher{i}" for i in (3, 4, 5, 6, 0, 1, 2)])
+
+    def test_filter_by_subject(self):
+        usernames, _ = self.collect({"subject": self.art.id})
+
+        self.assertEqual(usernames, ["teacher3", "teacher5", "teacher1"])
+
+    def test_subjects_are_listed(self):
+        response = self.client.get(self.url, {"page_size": 1})
+
+        self.assertEqual(response.data["results"][0]["subject"], [
+            {"id": self.art.id, "name": "Art"},
+            {"id": self.math.id, "name": "Math"},
+        ])
+        self.assertNotIn("password", response.data["results"][0])
+        self.assertNotIn("email", response.data["results"][0])
+
+    def test_fixed_query_count(self):
+        # Page query plus one prefetch of the subjects, whatever the page size
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"page_size": 2})
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {"page_size": 7})
+
+    def test_invalid_subject(self):
+        response = self.client.get(self.url, {"subject": "math"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_many_teachers_without_name(self):
+        # Self-registered teachers share last_name == first_name == "", well past DRF's offset_cutoff
+        User = get_user_model()
+        User.objects.bulk_create([User(username=f"nameless{i:04}", is_teacher=True) for i in range(1300)])
+
+        usernames, pages = self.collect({"page_size": 100})
+
+        self.assertEqual(pages, 14)
+        self.assertEqual(len(usernames), 1307)
+        self.assertEqual(len(set(usernames)), 1307)
+        self.assertEqual(usernames[:1300], [f"nameless{i:04}" for i in range(1300)])
+
+    def test_previous_page(self):
+        first = self.client.get(self.url, {"page_size": 3})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertIsNone(first.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "bm9wZQ=="})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_values_of_the_wrong_type(self):
+        for position in (["abc", "def", "ghi"], ["Same", "First 0", "x"], [{"a": 1}, "", 1], [None, None, None]):
+            cursor = base64.b64encode(urlencode({"p": json.dumps(position)}).encode()).decode()
+            with self.subTest(position=position):
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
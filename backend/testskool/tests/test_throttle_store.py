@@ -0,0 +1,92 @@
+import os
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from ..throttling import ThrottleStore, SharedAnonRateThrottle
+
+
+class ThrottleStoreTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "throttle.sqlite3")
+        self.store = ThrottleStore(self.path)
+
+
+    def test_bucket_empties_and_refills(self):
+        results = [self.store.consume("client", 3, 60, now=100)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+        # One token is back after 60 / 3 seconds
+        self.assertFalse(self.store.consume("client", 3, 60, now=110)[0])
+        self.assertTrue(self.store.consume("client", 3, 60, now=130)[0])
+
+
+    def test_rejected_requests_do_not_go_negative(self):
+        for _ in range(10):
+            self.store.consume("client", 1, 60, now=100)
+        allowed, tokens = self.store.consume("client", 1, 60, now=100)
+        self.assertFalse(allowed)
+        self.assertGreaterEqual(tokens, 0)
+
+
+    def test_processes_share_counters(self):
+        # Another worker process opens its own connection to the same file
+        other = ThrottleStore(self.path)
+        self.assertTrue(self.store.consume("client", 2, 60, now=100)[0])
+        self.assertTrue(other.consume("client", 2, 60, now=100)[0])
+        self.assertFalse(self.store.consume("client", 2, 60, now=100)[0])
+        self.assertTrue(other.consume("another-client", 2, 60, now=100)[0])
+
+
+    def test_one_row_per_client(self):
+        for now in range(100, 200):
+            self.store.consume("client", 180, 60, now=now)
+        rows = self.store.connection.execute("SELECT COUNT(*) FROM throttle_bucket").fetchone()[0]
+        self.assertEqual(rows, 1)
+
+
+    def test_reset_keeps_other_processes_buckets(self):
+        other = ThrottleStore(self.path)
+        self.assertTrue(self.store.consume("client", 1, 60, now=100)[0])
+        self.assertFalse(other.consume("client", 1, 60, now=100)[0])
+
+        self.store.reset()
+        self.assertTrue(self.store.consume("client", 1, 60, now=100)[0])
+        self.assertFalse(other.consume("client", 1, 60, now=100)[0])
+        rows = self.store.connection.execute("SELECT COUNT(*) FROM throttle_bucket").fetchone()[0]
+        self.assertEqual(rows, 2)
+
+
+    def test_prune_idle_buckets(self):
+        self.store.consume("idle", 3, 60, now=0)
+        self.store.consume("active", 3, 60, now=ThrottleStore.IDLE_TIMEOUT + 10)
+        self.store.prune(now=ThrottleStore.IDLE_TIMEOUT + 10)
+        keys = [row[0] for row in self.store.connection.execute("SELECT key FROM throttle_bucket")]
+        self.assertEqual(keys, ["active"])
+
+
+
+class SharedThrottleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+
+    def test_anon_throttle_uses_shared_store(self):
+        class TwoPerMinute(SharedAnonRateThrottle):
+            rate = "2/minute"
+
+        request = APIRequestFactory().get("/")
+        request.user = None
+
+        with override_settings(THROTTLE_STORE_PATH=os.path.join(self.dir.name, "throttle.sqlite3")):
+            results = [TwoPerMinute().allow_request(request, None) for _ in range(3)]
+            throttle = TwoPerMinute()
+            self.assertFalse(throttle.allow_request(request, None))
+            self.assertGreater(throttle.wait(), 0)
+            self.assertLessEqual(throttle.wait(), 30)
+
+        self.assertEqual(results, [True, True, False])
@@ -229,6 +229,22 @@ class UpdateUserSerializerTest(APITestCase):
         self.assertEqual(updated_user.last_name, "New Last Name")
         self.assertNotEqual(updated_user.first_name, "John")
         self.assertNotEqual(updated_user.last_name, "Doe")
+
+    # Test case for a stale (e.g. cached) instance not writing back other columns
+    def test_update_keeps_columns_changed_elsewhere(self):
+        other = get_user_model().objects.get(pk=self.user.pk)
+        other.set_password("changed-elsewhere")
+        other.is_active = False
+        other.save()
+
+        serializer = UpdateProfileSerializer(instance=self.user, data={"about": "Stale instance"})
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.about, "Stale instance")
+        self.assertTrue(self.user.check_password("changed-elsewhere"))
+        self.assertFalse(self.user.is_active)
     
 
     # Helper function for creating images
@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+import time
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from .metrics import throttled_requests
+
+
+# Token bucket throttling shared by every worker process on the host
+# Each client is a single row (tokens left, last update time) in a small SQLite
+# file, so all processes see the same counters and memory per client stays constant.
+# https://www.django-rest-framework.org/api-guide/throttling/#custom-throttles
+
+class ThrottleStore:
+    """ SQLite backed token buckets """
+
+    # Refill the bucket for the elapsed time and take one token if there is one
+    CONSUME_SQL = """
+        INSERT INTO throttle_bucket (key, tokens, updated, allowed)
+        VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE WHEN MIN(:capacity, tokens + (:now - updated) * :refill) >= 1
+                          THEN MIN(:capacity, tokens + (:now - updated) * :refill) - 1
+                          ELSE MIN(:capacity, tokens + (:now - updated) * :refill) END,
+            allowed = MIN(:capacity, tokens + (:now - updated) * :refill) >= 1,
+            updated = :now
+        RETURNING allowed, tokens
+    """
+    PRUNE_EVERY = 1000
+    IDLE_TIMEOUT = 60 * 60 * 24
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+        self.calls = 0
+        # Prefix of the bucket keys, the same in every process until reset()
+        self.namespace = ""
+
+    @property
+    def connection(self):
+        # sqlite3 connections cannot be shared between threads
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, allowed INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.local.connection = connection
+        return connection
+
+    def consume(self, key, capacity, duration, now=None):
+        """ Return (allowed, tokens left) for one request of `key` """
+        now = time.time() if now is None else now
+        allowed, tokens = self.connection.execute(self.CONSUME_SQL, {
+            "key": self.namespace + key,
+            "capacity": capacity,
+            "refill": capacity / duration,
+            "now": now,
+        }).fetchone()
+
+        self.calls += 1
+        if self.calls % self.PRUNE_EVERY == 0:
+            self.prune(now)
+        return bool(allowed), tokens
+
+    def prune(self, now=None):
+        """ Drop idle buckets, a missing bucket is the same as a full one """
+        now = time.time() if now is None else now
+        self.connection.execute("DELETE FROM throttle_bucket WHERE updated < ?", (now - self.IDLE_TIMEOUT,))
+
+    def reset(self):
+        """ Start over with full buckets in this process, without touching those of other processes """
+        # The old buckets are left to prune()
+        self.namespace = f"{time.time_ns()}:"
+
+
+throttle_store = ThrottleStore(settings.THROTTLE_STORE_PATH)
+
+
+@receiver(setting_changed)
+def reset_throttle_store(setting, **kwargs):
+    # Counters made with the old rates (or store) no longer apply
+    global throttle_store
+    if setting == "THROTTLE_STORE_PATH":
+        throttle_store = ThrottleStore(settings.THROTTLE_STORE_PATH)
+    elif setting == "REST_FRAMEWORK":
+        throttle_store.reset()
+
+
+class SharedRateThrottleMixin:
+    """ Replace DRF's per-process request history with the shared token bucket """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        allowed, self.tokens = throttle_store.consume(self.key, self.num_requests, self.duration)
+        if not allowed:
+            throttled_requests.inc(scope=self.scope)
+        return allowed
+
+    def wait(self):
+        # Time until the bucket holds one whole token again
+        return max(0.0, (1 - self.tokens) * self.duration / self.num_requests)
+
+
+class SharedAnonRateThrottle(SharedRateThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(SharedRateThrottleMixin, UserRateThrottle):
+    pass
@@ -1,5 +1,5 @@
 from django.urls import path
-from testskool import views
+from testskool import views, async_views
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -11,8 +11,22 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     path("subject-list/", views.SubjectListView.as_view(), name="subject-list"),
+    path("subject/<int:pk>/leaderboard/", views.subject_leaderboard, name="subject-leaderboard"),
+    path("teacher-list/", views.TeacherListView.as_view(), name="teacher-list"),
+    path("quiz-list/", views.QuizListView.as_view(), name="quiz-list"),
+    path("quiz/<int:pk>/", views.QuizDetailView.as_view(), name="quiz-detail"),
+    path("quiz/<int:pk>/stats/", views.QuizStatsView.as_view(), name="quiz-stats"),
+    path("gradebook/export/", views.GradebookExportView.as_view(), name="gradebook-export"),
+    path("question-bank/import/", views.question_bank_import, name="question-bank-import"),
+    path("question-bank/export/", views.QuestionBankExportView.as_view(), name="question-bank-export"),
+    path("search/", views.search_view, name="search"),
     path("register/", views.register, name="register"),
+    path("bulk-register/", views.bulk_register, name="bulk-register"),
     path("my-profile/", views.MyProfileView.as_view(), name="my-profile"),
     path("edit-profile/", views.edit_profile, name="edit-profile"),
     path("delete-account/", views.delete_account, name="delete-account"),
+
+    # ASGI-native versions of the read endpoints
+    path("async/subject-list/", async_views.subject_list, name="async-subject-list"),
+    path("async/my-profile/", async_views.my_profile, name="async-my-profile"),
 ]
@@ -1,3 +1,7 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
 class Notification:
     def get_message(key: str):
         messages = {
@@ -13,6 +17,14 @@ class Notification:
                 "status": "success",
                 "message": "Account deleted successfully."
             },
+            "roster_imported": {
+                "status": "success",
+                "message": "Roster imported."
+            },
+            "question_bank_imported": {
+                "status": "success",
+                "message": "Question bank imported."
+            },
         }
 
         # Return a default message if message not found
@@ -20,3 +32,21 @@ class Notification:
             "status": "error",
             "message": "An unexpected error occurred."
         })
+
+
+
+# https://www.django-rest-framework.org/api-guide/responses/
+class PrerenderedResponse(Response):
+    """ Response carrying an already rendered JSON body """
+
+    def __init__(self, data, body, **kwargs):
+        super().__init__(data, **kwargs)
+        self.body = body
+
+    @property
+    def rendered_content(self):
+        # Skip re-encoding for JSON (and FastJSONRenderer), let other renderers (browsable API) work as usual
+        if isinstance(getattr(self, "accepted_renderer", None), JSONRenderer):
+            self["Content-Type"] = self.accepted_renderer.media_type
+            return self.body
+        return super().rendered_content
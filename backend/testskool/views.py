@@ -2,18 +2,48 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework import generics
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+import re
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Prefetch
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from .serializers import (
     Subjects,
     Register,
     MyProfileSerializer,
+    QuizCatalogSerializer,
+    TeacherDirectorySerializer,
+    QuizDetailSerializer,
+    QuizStatsSerializer,
     UpdateProfileSerializer,
     DeleteAccountSerializer
 )
-from .models import Subject
-from .utils import Notification
+from .models import Subject, Quiz, QuizStats, Question, StudentSolution
+from .permissions import IsTeacher
+from .pagination import QuizCursorPagination, TeacherCursorPagination
+from .utils import Notification, PrerenderedResponse
+from .roster import detect_format, open_upload, read_roster, import_roster
+from .catalog import get_subject_catalog, request_catalog, catalog_etag, catalog_last_modified
+from .quiz_payload import get_quiz_payload
+from .leaderboard import leaderboards
+from .projections import profile_data
+from .gradebook import gradebook_lines
+from .search import PUBLIC_KINDS, search
+from .question_bank import import_question_bank, read_question_bank, export_question_bank
+from .metrics import upload_size
+from .renderers import DownloadContentNegotiation
 
 
 class SubjectListView(generics.ListAPIView):
@@ -22,6 +52,20 @@ class SubjectListView(generics.ListAPIView):
     queryset = Subject.objects.all().order_by("name")
     serializer_class = Subjects
 
+    # Answer conditional requests with 304 Not Modified
+    # https://docs.djangoproject.com/en/5.1/topics/conditional-view-processing/
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        catalog = request_catalog(request)
+        response = PrerenderedResponse(catalog["data"], catalog["body"])
+
+        # Let clients keep the catalog but revalidate it on every use
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
 
 
 @api_view(['POST'])
@@ -40,6 +84,28 @@ def register(request):
 
 
 
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@parser_classes([MultiPartParser])
+def bulk_register(request):
+    """ Register a class roster (CSV or JSON Lines file) """
+    roster = request.FILES.get("roster")
+    if not roster:
+        return Response({"roster": ["Please upload a roster file."]}, status=status.HTTP_400_BAD_REQUEST)
+
+    fmt = detect_format(roster.name, request.data.get("format"))
+    if not fmt:
+        return Response({"format": ["Only CSV and JSON Lines rosters are allowed."]}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = list(import_roster(read_roster(open_upload(roster), fmt)))
+    created = sum(1 for row in rows if row["status"] == "created")
+
+    content = Notification.get_message("roster_imported")
+    content.update({"created": created, "failed": len(rows) - created, "rows": rows})
+    return Response(content, status=status.HTTP_200_OK)
+
+
+
 class MyProfileView(generics.RetrieveAPIView):
     """ Send user's informations """
     queryset = get_user_model().objects.all()
@@ -48,6 +114,10 @@ class MyProfileView(generics.RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
+    def retrieve(self, request, *args, **kwargs):
+        # Read-only fast path with the same output as MyProfileSerializer (projections.py)
+        return Response(profile_data(self.get_object()))
+
 
 
 @api_view(['PUT'])
@@ -55,6 +125,8 @@ class MyProfileView(generics.RetrieveAPIView):
 def edit_profile(request):
     """ Edit user information """
     if request.method == "PUT":
+        for field, upload in request.FILES.items():
+            upload_size.observe(upload.size, view="edit-profile", field=field)
         serializer = UpdateProfileSerializer(instance=request.user, data=request.data, partial=True)
         if serializer.is_valid(raise_exception=True):
             serializer.save()
@@ -73,3 +145,223 @@ def delete_account(request):
         content = Notification.get_message("account_deleted")
         return Response(content, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+class QuizListView(generics.ListAPIView):
+    """ Quiz catalog, filterable by subject, owner and type """
+    permission_classes = [AllowAny]
+    serializer_class = QuizCatalogSerializer
+    pagination_class = QuizCursorPagination
+
+    def get_queryset(self):
+        queryset = Quiz.objects.select_related("subject", "quiz_owner")
+
+        # Each filter is served by the (subject, date) or (quiz_owner, date) index
+        for param, field in (("subject", "subject_id"), ("owner", "quiz_owner_id")):
+            value = self.request.query_params.get(param)
+            if value is not None:
+                if not value.isdigit():
+                    raise ValidationError({param: ["A valid integer is required."]})
+                queryset = queryset.filter(**{field: int(value)})
+
+        quiz_type = self.request.query_params.get("type")
+        if quiz_type:
+            queryset = queryset.filter(type=quiz_type)
+        return queryset
+
+
+
+class TeacherListView(generics.ListAPIView):
+    """ Teacher directory, filterable by subject """
+    permission_classes = [AllowAny]
+    serializer_class = TeacherDirectorySerializer
+    pagination_class = TeacherCursorPagination
+
+    def get_queryset(self):
+        # One query for the page and one for the subjects of all its teachers
+        queryset = get_user_model().objects.filter(is_teacher=True, is_active=True).prefetch_related(
+            Prefetch("subject", queryset=Subject.objects.order_by("name"))
+        )
+
+        subject = self.request.query_params.get("subject")
+        if subject is not None:
+            if not subject.isdigit():
+                raise ValidationError({"subject": ["A valid integer is required."]})
+            queryset = queryset.filter(subject=int(subject))
+        return queryset
+
+
+
+# Same test as django.middleware.gzip.GZipMiddleware
+re_accepts_gzip = re.compile(r"\bgzip\b")
+
+
+class QuizDetailView(generics.RetrieveAPIView):
+    """ Quiz with its questions and choices, for the students taking it """
+    serializer_class = QuizDetailSerializer
+
+    def retrieve(self, request, *args, **kwargs):
+        payload = get_quiz_payload(kwargs["pk"])
+        if payload is None:
+            raise NotFound()
+
+        compressed = (
+            isinstance(request.accepted_renderer, JSONRenderer)
+            and re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        )
+        # Each encoding is its own representation with its own validator
+        etag = f'"{payload["etag"]}-gzip"' if compressed else f'"{payload["etag"]}"'
+        last_modified = int(payload["last_modified"].timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            if compressed:
+                response = HttpResponse(payload["gzip"], content_type=request.accepted_renderer.media_type)
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = PrerenderedResponse(payload["data"], payload["body"])
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+
+class QuizStatsView(generics.RetrieveAPIView):
+    """ Statistics of a quiz, for its owner """
+    serializer_class = QuizStatsSerializer
+
+    def get_queryset(self):
+        # Primary key lookup of the materialized row, the owner check is joined in
+        return QuizStats.objects.filter(quiz__quiz_owner=self.request.user)
+
+
+
+@api_view(["POST"])
+@permission_classes([IsTeacher])
+@parser_classes([MultiPartParser])
+def question_bank_import(request):
+    """ Import a question bank (JSON Lines file) into the teacher's quizzes """
+    bank = request.FILES.get("bank")
+    if not bank:
+        return Response({"bank": ["Please upload a question bank file."]}, status=status.HTTP_400_BAD_REQUEST)
+
+    created, errors = 0, []
+    for entry in import_question_bank(request.user, read_question_bank(open_upload(bank))):
+        if entry["status"] == "created":
+            created += 1
+        else:
+            errors.append(entry)
+
+    content = Notification.get_message("question_bank_imported")
+    content.update({"created": created, "failed": len(errors), "errors": errors})
+    return Response(content, status=status.HTTP_200_OK)
+
+
+
+class QuestionBankExportView(APIView):
+    """ Download the teacher's questions (optionally of one quiz) as JSON Lines """
+    permission_classes = [IsTeacher]
+    content_negotiation_class = DownloadContentNegotiation
+
+    def get(self, request):
+        questions = Question.objects.filter(quiz__quiz_owner=request.user)
+        quiz = request.query_params.get("quiz")
+        if quiz is not None:
+            if not quiz.isdigit():
+                raise ValidationError({"quiz": ["A valid integer is required."]})
+            questions = questions.filter(quiz_id=int(quiz))
+
+        response = StreamingHttpResponse(export_question_bank(questions), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="question-bank.jsonl"'
+        return response
+
+
+
+@api_view(["GET"])
+def subject_leaderboard(request, pk):
+    """ Best students of a subject and the rank of the requesting user """
+    # Subject ids come from the cached catalog, rankings from memory (leaderboard.py)
+    if not any(subject["id"] == pk for subject in get_subject_catalog()["data"]):
+        raise NotFound()
+
+    limit = request.query_params.get("limit", str(settings.LEADERBOARD_SIZE))
+    if not limit.isdigit():
+        raise ValidationError({"limit": ["A valid integer is required."]})
+    limit = min(int(limit), settings.LEADERBOARD_MAX_SIZE)
+
+    top = leaderboards.top(pk, limit)
+    students = get_user_model().objects.filter(pk__in=[student_id for _, student_id, _ in top])
+    students = {student["id"]: student for student in students.values("id", "username", "first_name", "last_name")}
+    rank = leaderboards.rank(pk, request.user.id)
+
+    return Response({
+        "subject": pk,
+        "students": leaderboards.size(pk),
+        "top": [
+            {"rank": position, "score": score, "student": students.get(student_id)}
+            for position, student_id, score in top
+        ],
+        "me": {"rank": rank[0], "score": rank[1]} if rank else None,
+    }, status=status.HTTP_200_OK)
+
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def search_view(request):
+    """ Search subjects, teachers and quizzes, best matches first """
+    text = request.query_params.get("q", "")
+    kind = request.query_params.get("kind")
+    if kind is not None and kind not in PUBLIC_KINDS:
+        raise ValidationError({"kind": [f"Choose one of: {', '.join(PUBLIC_KINDS)}."]})
+
+    limit = request.query_params.get("limit", str(settings.SEARCH_RESULTS))
+    if not limit.isdigit():
+        raise ValidationError({"limit": ["A valid integer is required."]})
+
+    results = search(text, kinds=(kind,) if kind else PUBLIC_KINDS, limit=min(int(limit), settings.SEARCH_MAX_RESULTS))
+    return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+
+def _day_start(value, param):
+    try:
+        day = parse_date(value) if value else None
+    except ValueError:
+        # Well formed but not a date, e.g. 2024-02-30
+        day = None
+    if day is None:
+        raise ValidationError({param: ["Enter a date as YYYY-MM-DD."]})
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class GradebookExportView(APIView):
+    """ Download the grade book of the teacher's quizzes as CSV """
+    permission_classes = [IsTeacher | IsAdminUser]
+    content_negotiation_class = DownloadContentNegotiation
+
+    def get(self, request):
+        solutions = StudentSolution.objects.all()
+        # Admins export every quiz
+        if not request.user.is_staff:
+            solutions = solutions.filter(solved_quiz__quiz_owner=request.user)
+
+        for param, field in (("subject", "solved_quiz__subject_id"), ("quiz", "solved_quiz_id")):
+            value = request.query_params.get(param)
+            if value is not None:
+                if not value.isdigit():
+                    raise ValidationError({param: ["A valid integer is required."]})
+                solutions = solutions.filter(**{field: int(value)})
+
+        # Inclusive date range
+        if "date_from" in request.query_params:
+            solutions = solutions.filter(date__gte=_day_start(request.query_params["date_from"], "date_from"))
+        if "date_to" in request.query_params:
+            solutions = solutions.filter(date__lt=_day_start(request.query_params["date_to"], "date_to") + timedelta(days=1))
+
+        response = StreamingHttpResponse(gradebook_lines(solutions), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="gradebook.csv"'
+        return response